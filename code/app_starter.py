@@ -1,12 +1,14 @@
 import copy
 import os
-import threading
 import wx
 from ui_elements import ColoredTab,NewBoardDialog, DrawDialog
 from ui_elements import RoundButton
+from my_jobs import DrawQueue, JobManager
 from my_plotter import MatrixDisplay
 from my_solver import Solver
 
+BOARD = "board"
+
 class MainWindow(wx.Frame):
     def __init__(self, parent, title):
         wx.Frame.__init__(self, parent, title=title)
@@ -15,7 +17,14 @@ class MainWindow(wx.Frame):
         self.InitUI()
 
         self.solver = Solver()
-        self.solver.set_hook(self.pin_display.external_draw)
+        self.solver.set_hook(DrawQueue(wx.CallAfter,self.pin_display.external_draw))
+        self.pin_display.set_edit_hook(self.OnEdit)
+
+        self.jobs = JobManager(wx.CallAfter)
+        self.job_label = ""
+        self.status = self.CreateStatusBar()
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER,self.OnTick,self.timer)
 
         self.Center()
 
@@ -97,11 +106,12 @@ class MainWindow(wx.Frame):
 
     def OnLoad(self,_):
 
-        with wx.FileDialog(self, "Choose a file to load", "", "", "*.csv", wx.FD_OPEN) as dlg:
+        with wx.FileDialog(self, "Choose a file to load", "", "", "Boards (*.csv;*.arb)|*.csv;*.arb", wx.FD_OPEN) as dlg:
             if dlg.ShowModal() == wx.ID_OK:
                 self.filename = dlg.GetFilename()
                 self.dirname = dlg.GetDirectory()
-                self.solver.read_from_csv(os.path.join(self.dirname, self.filename))
+                self.jobs.cancel(BOARD,wait=True)
+                self.solver.read_from_file(os.path.join(self.dirname, self.filename))
 
     def OnSave(self,_):
         
@@ -109,21 +119,53 @@ class MainWindow(wx.Frame):
             if dlg.ShowModal() == wx.ID_OK:
                 self.filename = dlg.GetFilename()
                 self.dirname = dlg.GetDirectory()
+                self.jobs.cancel(BOARD,wait=True)
                 self.solver.set_matrix(copy.deepcopy(self.pin_display.matrix))
                 self.solver.write_to_csv(os.path.join(self.dirname, self.filename))
 
     def OnGenerate(self,_):
+        if self.jobs.cancel(BOARD):
+            self.status.SetStatusText(f"{self.job_label}: cancelling")
+            return
         self.solver.set_matrix(copy.deepcopy(self.pin_display.matrix))
-        x = threading.Thread(target=self.solver.solve)
-        x.start()
+        self.start_job("solving",lambda job: self.solver.solve(progress=job.report,cancel=job.cancel),
+                       lambda unrouted: f"{len(unrouted)} nets unrouted" if unrouted else "all nets routed")
+
+    def start_job(self,label,func,summary):
+        if self.jobs.submit(BOARD,func,lambda job: self.OnJobDone(job,summary)) is None: return
+        self.job_label = label
+        self.status.SetStatusText(label)
+        self.timer.Start(250)
+
+    def OnTick(self,_):
+        job = self.jobs.running(BOARD)
+        if job is None: return
+        progress = "  ".join(f"{name} {value}" for name,value in job.progress.items())
+        self.status.SetStatusText(f"{self.job_label} {job.elapsed():.1f}s  {progress}  (click again to cancel)")
+
+    def OnJobDone(self,job,summary):
+        self.timer.Stop()
+        if job.error is not None: outcome = f"failed: {job.error!r}"
+        elif job.cancel.is_set(): outcome = f"cancelled, {summary(job.result)}"
+        else: outcome = summary(job.result)
+        self.status.SetStatusText(f"{self.job_label} {job.elapsed():.1f}s  {outcome}")
+
+    def OnEdit(self,i,j,val):
+        if self.jobs.running(BOARD): return
+        rows,cols = len(self.pin_display.matrix),len(self.pin_display.matrix[0])
+        if self.solver.matrix.shape != (rows+2,cols+2): self.solver.set_matrix(copy.deepcopy(self.pin_display.matrix))
+        else: self.solver.set_cell(i+1,j+1,val)
+        violations = self.solver.find_violations(incremental=True)
+        self.pin_display.show_violations(violation.cell for violation in violations)
 
     def OnValidate(self,_):
-        x = threading.Thread(target=self.solver.validate_solution)
-        x.start()
+        self.start_job("validating",lambda job: self.solver.validate_solution(),
+                       lambda violations: f"{len(violations)} violations")
 
     def OnNew(self,_):
         with NewBoardDialog(self) as dlg:
             if dlg.ShowModal() == wx.ID_OK:
+                self.jobs.cancel(BOARD,wait=True)
                 self.solver.generate_empty_matrix(dlg.get_value())
 
 app = wx.App(False)
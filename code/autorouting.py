@@ -0,0 +1,193 @@
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import json
+import os
+import sys
+import time
+from my_benchmark import compare, run_benchmark
+from my_generator import generate_board
+from my_io import BINARY_SUFFIX, binary_to_csv, csv_to_binary
+from my_io import read_board, write_board
+from my_routers import CoarseRouter, ElasticRouter, MazeRouter
+from my_solver import Solver
+from my_sparse import SPARSE_SUFFIX, SparseBoard, solve_sparse
+from my_stats import Stats
+
+ROUTERS = {"elastic": ElasticRouter, "maze": MazeRouter, "coarse": CoarseRouter}
+
+def solve_board(path, out, router = None, time_limit = None, max_candidates = None, strategy = "search", stats = False):
+    name, suffix = os.path.splitext(os.path.basename(path))
+    if suffix == SPARSE_SUFFIX: return solve_sparse_board(path, out, router, time_limit, max_candidates, strategy, stats)
+    summary = {"board": path, "status": "error", "time": 0.0, "nets": 0, "nets_routed": 0, "unrouted": [], "wire_length": 0}
+
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+    solver.instrument(stats)
+    start = time.perf_counter()
+    try:
+        solver.read_from_file(path)
+        terminals = int((Solver.trim_matrix(solver.matrix) > 0).sum())
+        unrouted = solver.solve(ROUTERS[router]() if router else None, time_limit, max_candidates, strategy=strategy)
+        solver.write_to_csv(os.path.join(out, name + ".csv"))
+
+        summary.update(status="solved" if not unrouted else "partial", nets=len(solver.pins),
+                       nets_routed=len(solver.pins) - len(unrouted), unrouted=unrouted,
+                       wire_length=int((Solver.trim_matrix(solver.matrix) > 0).sum()) - terminals)
+    except Exception as error:
+        summary["error"] = repr(error)
+
+    summary["time"] = round(time.perf_counter() - start, 4)
+    if stats: summary["stats"] = solver.stats.report()
+    with open(os.path.join(out, name + ".json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    return summary
+
+def solve_sparse_board(path, out, router = None, time_limit = None, max_candidates = None, strategy = "search", stats = False):
+    name = os.path.splitext(os.path.basename(path))[0]
+    summary = {"board": path, "status": "error", "time": 0.0, "nets": 0, "nets_routed": 0, "unrouted": [], "wire_length": 0}
+
+    collected = Stats(stats)
+    start = time.perf_counter()
+    try:
+        board = SparseBoard.read(path)
+        terminals = sum(len(cells) for cells in board.nets.values())
+        unrouted = solve_sparse(board, ROUTERS[router]() if router else None, time_limit, strategy, max_candidates=max_candidates, stats=collected)
+        board.write(os.path.join(out, name + SPARSE_SUFFIX))
+
+        summary.update(status="solved" if not unrouted else "partial", nets=len(board.nets),
+                       nets_routed=len(board.nets) - len(unrouted), unrouted=unrouted,
+                       wire_length=sum(len(board.cells(net)) for net in board.nets) - terminals)
+    except Exception as error:
+        summary["error"] = repr(error)
+
+    summary["time"] = round(time.perf_counter() - start, 4)
+    if stats: summary["stats"] = collected.report()
+    with open(os.path.join(out, name + ".json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    return summary
+
+def board_paths(patterns):
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern) or [pattern]})
+    stems = defaultdict(list)
+    for path in paths: stems[os.path.splitext(os.path.basename(path))[0]].append(path)
+    clashes = [names for names in stems.values() if len(names) > 1]
+    if clashes: raise ValueError("boards would overwrite each other's output: " + "; ".join(", ".join(names) for names in clashes))
+    return paths
+
+def solve_command(args):
+    if args.strategy == "negotiate" and args.router not in (None, "maze"):
+        print(f"--strategy negotiate routes with the maze router, not {args.router}", file=sys.stderr)
+        return 2
+    try: paths = board_paths(args.boards)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    os.makedirs(args.out, exist_ok=True)
+
+    failed = 0
+    with ProcessPoolExecutor(args.jobs) as pool:
+        futures = [pool.submit(solve_board, path, args.out, args.router, args.time_limit, args.max_candidates, args.strategy, args.stats) for path in paths]
+        for future in as_completed(futures):
+            summary = future.result()
+            failed += summary["status"] != "solved"
+            print(f"{summary['status']:8} {summary['time']:8.3f}s {summary['nets_routed']}/{summary['nets']} nets  {summary['board']}")
+
+    return 1 if failed else 0
+
+def convert_command(args):
+    try: paths = board_paths(args.boards)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    os.makedirs(args.out, exist_ok=True)
+    for path in paths:
+        name, suffix = os.path.splitext(os.path.basename(path))
+        if suffix == BINARY_SUFFIX: binary_to_csv(path, os.path.join(args.out, name + ".csv"), args.layer)
+        elif suffix == SPARSE_SUFFIX: write_board(os.path.join(args.out, name + ".csv"), SparseBoard.read(path).to_dense())
+        elif args.sparse: SparseBoard.from_dense(read_board(path, args.chunk_rows)).write(os.path.join(args.out, name + SPARSE_SUFFIX))
+        else: csv_to_binary(path, os.path.join(args.out, name + BINARY_SUFFIX), args.chunk_rows)
+    return 0
+
+def generate_command(args):
+    os.makedirs(args.out, exist_ok=True)
+    for seed in range(args.seed, args.seed + args.count):
+        solver = Solver()
+        solver.set_matrix(generate_board(args.height, args.width, args.nets or max(2, args.height//5), args.terminals, args.zpins, args.clustering, seed))
+        solver.write_to_csv(os.path.join(args.out, f"board_{args.height}x{args.width or args.height}_{seed}.csv"))
+    return 0
+
+def bench_command(args):
+    report = run_benchmark(args.sizes, args.nets, args.terminals, args.zpins, args.clustering, args.seed, args.repeat, args.time_limit, args.strategy)
+    for entry in report["results"]:
+        print(f"{entry['size']:5} " + "  ".join(f"{phase} {seconds:.4f}s" for phase, seconds in entry["phases"].items()))
+
+    if args.out:
+        with open(args.out, "w") as file: json.dump(report, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file: json.dump(report, file, indent=2)
+        return 0
+    if not args.baseline or not os.path.exists(args.baseline): return 0
+
+    with open(args.baseline) as file:
+        regressions = compare(report, json.load(file), args.threshold)
+    for regression in regressions:
+        print(f"regression: size {regression['size']} {regression['phase']} {regression['baseline']:.4f}s -> {regression['time']:.4f}s")
+    return 1 if regressions else 0
+
+def add_board_arguments(parser):
+    parser.add_argument("--nets", type=int, default=None, help="nets per board, size//5 when omitted")
+    parser.add_argument("--terminals", type=int, default=2, help="terminals per net")
+    parser.add_argument("--zpins", type=float, default=0.01, help="fraction of cells holding Z pins")
+    parser.add_argument("--clustering", type=float, default=0.0, help="0 spreads terminals over the board, 1 packs them together")
+    parser.add_argument("--seed", type=int, default=0)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog="autorouting")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve board csv files headlessly")
+    solve.add_argument("boards", nargs="+", help="board csv files or glob patterns")
+    solve.add_argument("--jobs", type=int, default=os.cpu_count(), help="boards solved in parallel")
+    solve.add_argument("--out", default="results", help="directory for solved csv and json summaries")
+    solve.add_argument("--router", choices=sorted(ROUTERS), default=None, help="elastic for the ordering search, negotiation always uses maze")
+    solve.add_argument("--strategy", choices=["search", "negotiate"], default="search", help="ordering search or negotiated rip-up and reroute")
+    solve.add_argument("--time-limit", type=float, default=None, help="seconds allowed per board")
+    solve.add_argument("--max-candidates", type=int, default=None, help="candidate placements allowed per board")
+    solve.add_argument("--stats", action="store_true", help="add phase timings and search counters to the json summaries")
+    solve.set_defaults(run=solve_command)
+
+    convert = commands.add_parser("convert", help="convert boards between csv and the binary format")
+    convert.add_argument("boards", nargs="+", help="csv, binary or sparse board files or glob patterns")
+    convert.add_argument("--out", default=".", help="directory for the converted boards")
+    convert.add_argument("--layer", default="cells", help="layer written when converting a binary board to csv")
+    convert.add_argument("--chunk-rows", type=int, default=None, help="stream csv input in blocks of rows")
+    convert.add_argument("--sparse", action="store_true", help="write csv boards as sparse net lists instead of binary")
+    convert.set_defaults(run=convert_command)
+
+    generate = commands.add_parser("generate", help="write seeded synthetic boards as csv")
+    generate.add_argument("height", type=int)
+    generate.add_argument("width", type=int, nargs="?", default=None)
+    generate.add_argument("--count", type=int, default=1, help="boards to write, one per consecutive seed")
+    generate.add_argument("--out", default="boards")
+    add_board_arguments(generate)
+    generate.set_defaults(run=generate_command)
+
+    bench = commands.add_parser("bench", help="time the solver phases over a board size sweep")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80])
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--strategy", choices=["search", "negotiate"], default="search")
+    bench.add_argument("--time-limit", type=float, default=30.0, help="seconds allowed per solve")
+    bench.add_argument("--out", default=None, help="json report path")
+    bench.add_argument("--baseline", default="benchmark_baseline.json", help="stored report to compare against")
+    bench.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    bench.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction of the baseline")
+    add_board_arguments(bench)
+    bench.set_defaults(run=bench_command)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
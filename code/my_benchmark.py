@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+from my_generator import generate_board
+from my_solver import Solver
+
+PHASES = ("read_from_csv", "get_pins", "generate_vector_fields", "solve", "validate_solution")
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def bench_board(path, time_limit = None, strategy = "search"):
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+
+    times = {}
+    times["read_from_csv"], _ = timed(solver.read_from_csv, path)
+    times["get_pins"], _ = timed(solver.get_pins)
+    times["generate_vector_fields"], _ = timed(solver.generate_vector_fields)
+    solver.field_cache.clear()
+    times["solve"], unrouted = timed(solver.solve, time_limit=time_limit, strategy=strategy)
+    times["validate_solution"], violations = timed(solver.validate_solution)
+    return times, {"nets": len(solver.pins), "unrouted": len(unrouted), "violations": len(violations)}
+
+def run_benchmark(sizes, nets = None, terminals = 2, zpins = 0.01, clustering = 0.0, seed = 0, repeat = 3, time_limit = 30.0, strategy = "search"):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            board = generate_board(size, nets=nets or max(2, size//5), terminals=terminals, zpins=zpins, clustering=clustering, seed=seed)
+            path = os.path.join(folder, f"board_{size}.csv")
+            solver = Solver()
+            solver.set_matrix(board)
+            solver.write_to_csv(path)
+
+            best = dict.fromkeys(PHASES, float("inf"))
+            for _ in range(repeat):
+                times, outcome = bench_board(path, time_limit, strategy)
+                best = {phase: min(best[phase], times[phase]) for phase in PHASES}
+
+            results.append({"size": size, **outcome, "phases": {phase: round(best[phase], 6) for phase in PHASES}})
+
+    return {"seed": seed, "terminals": terminals, "zpins": zpins, "clustering": clustering, "strategy": strategy, "results": results}
+
+def compare(report, baseline, threshold = 0.2, floor = 0.005):
+    reference = {entry["size"]: entry["phases"] for entry in baseline["results"]}
+    regressions = []
+    for entry in report["results"]:
+        for phase, seconds in entry["phases"].items():
+            before = reference.get(entry["size"], {}).get(phase)
+            if before is not None and seconds > max(before*(1 + threshold), before + floor):
+                regressions.append({"size": entry["size"], "phase": phase, "baseline": before, "time": seconds})
+    return regressions
@@ -0,0 +1,221 @@
+from itertools import product
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+CELL_DTYPE = np.int16
+ROUTE_DTYPE = np.int32
+
+EMPTY = 0
+BORDER = -1
+ZPIN = -2
+ORIGIN = -3
+ERROR = -4
+
+DIRECTIONS = ((0, -1), (0, 1), (1, 0), (-1, 0))
+
+CODES = {"B": BORDER, "Z": ZPIN, "F": ORIGIN, "E": ERROR}
+SYMBOLS = {code: symbol for symbol, code in CODES.items()}
+
+def encode_cell(val):
+    return CODES[val] if val in CODES else int(val)
+
+def decode_cell(val):
+    return val if val >= 0 else SYMBOLS[val]
+
+def encode_rows(rows):
+    return np.array([[encode_cell(el) for el in row] for row in rows], dtype=CELL_DTYPE)
+
+def decode_rows(mat):
+    return [[decode_cell(el) for el in row] for row in mat.tolist()]
+
+def compact_route(cells):
+    return np.unique(np.asarray(cells, dtype=ROUTE_DTYPE))
+
+def window_reduce(mat, radius, reduce, fill):
+    for axis in (0, 1):
+        pad = [(0, 0), (0, 0)]
+        pad[axis] = (radius, radius)
+        padded = np.pad(mat, pad, constant_values=fill)
+        mat = reduce(sliding_window_view(padded, 2*radius + 1, axis=axis), axis=-1)
+    return mat
+
+def dilate(mask, radius = 1):
+    return window_reduce(mask, radius, np.max, False)
+
+def label_extent(mat, labelled, radius, top, bottom, left, right):
+    height, width = mat.shape
+    top, bottom, left, right = max(top, 0), min(bottom, height), max(left, 0), min(right, width)
+    outer_top, outer_left = max(top - radius, 0), max(left - radius, 0)
+    mat = mat[outer_top:min(bottom + radius, height), outer_left:min(right + radius, width)]
+
+    mask = labelled(mat)
+    info = np.iinfo(mat.dtype)
+    high = window_reduce(np.where(mask, mat, info.min), radius, np.max, info.min)
+    low = window_reduce(np.where(mask, mat, info.max), radius, np.min, info.max)
+
+    inner = (slice(top - outer_top, bottom - outer_top), slice(left - outer_left, right - outer_left))
+    return (slice(top, bottom), slice(left, right)), mat[inner], high[inner], low[inner]
+
+class Journal:
+
+    def __init__(self):
+        self.entries = []
+        self.copies = 0
+
+    def record(self, array, key):
+        self.entries.append((array, key, array[key].copy()))
+        self.copies += 1
+
+    def checkpoint(self): return len(self.entries)
+
+    def rollback(self, mark):
+        while len(self.entries) > mark:
+            array, key, old = self.entries.pop()
+            array[key] = old
+
+    def clear(self): self.entries = []
+
+class KeepOut:
+
+    def __init__(self, mat, radius = 1):
+        self.mat = mat
+        self.radius = radius
+        self.journal = Journal()
+
+        self.clear = np.zeros(mat.shape, dtype=bool)
+        self.owner = np.zeros(mat.shape, dtype=CELL_DTYPE)
+        self.refresh(0, mat.shape[0], 0, mat.shape[1])
+
+        span = range(-radius, radius + 1)
+        self.ring = np.array([di*mat.shape[1] + dj for di, dj in product(span, span)], dtype=np.int64)
+
+    def refresh(self, top, bottom, left, right):
+        window, mat, high, low = label_extent(self.mat, lambda mat: (mat != EMPTY) & (mat != BORDER), self.radius, top, bottom, left, right)
+        empty, covered = mat == EMPTY, high != np.iinfo(CELL_DTYPE).min
+        self.clear[window] = empty & ~covered
+        self.owner[window] = np.where(empty & covered & (high == low), high, EMPTY)
+
+    def free_mask(self, pin_nr):
+        return self.clear | (self.owner == pin_nr)
+
+    def free_at(self, pin_nr, cells):
+        return self.clear.ravel()[cells] | (self.owner.ravel()[cells] == pin_nr)
+
+    def write(self, route, pin_nr):
+        route = np.asarray(route, dtype=np.int64)
+        rows, cols = np.divmod(route, self.mat.shape[1])
+        top, left = max(rows.min() - self.radius, 0), max(cols.min() - self.radius, 0)
+        bottom, right = rows.max() + self.radius + 1, cols.max() + self.radius + 1
+
+        self.journal.record(self.mat, (rows, cols))
+        self.journal.record(self.clear, (slice(top, bottom), slice(left, right)))
+        self.journal.record(self.owner, (slice(top, bottom), slice(left, right)))
+
+        self.mat[rows, cols] = pin_nr
+        self.refresh(top, bottom, left, right)
+
+        touched = np.unique(route[:, None] + self.ring)
+        return touched[(touched >= 0) & (touched < self.mat.size)]
+
+class PinIndex(dict):
+
+    def __init__(self, mat = None):
+        super().__init__()
+        self.sums = {}
+        self.bounds = {}
+        self.width = 0
+        if mat is not None: self.build(mat)
+
+    def build(self, mat):
+        self.width = mat.shape[1]
+        self.clear()
+        self.sums.clear()
+        self.bounds.clear()
+
+        rows, cols = np.nonzero(mat > 0)
+        values = mat[rows, cols]
+        order = np.argsort(values, kind="stable")
+        pins, first, counts = np.unique(values, return_index=True, return_counts=True)
+        groups = np.split(order, np.cumsum(counts)[:-1])
+
+        for k in np.argsort(first, kind="stable").tolist():
+            pin_rows, pin_cols = rows[groups[k]], cols[groups[k]]
+            pin = int(pins[k])
+            self[pin] = np.stack((pin_rows, pin_cols), axis=1).tolist()
+            self.sums[pin] = [int(pin_rows.sum()), int(pin_cols.sum())]
+            self.bounds[pin] = (int(pin_rows.min()), int(pin_rows.max()), int(pin_cols.min()), int(pin_cols.max()))
+
+    def add(self, pin, cell):
+        i, j = cell
+        if pin not in self:
+            self[pin], self.sums[pin], self.bounds[pin] = [], [0, 0], (i, i, j, j)
+        self[pin].append([i, j])
+        self.sums[pin][0] += i
+        self.sums[pin][1] += j
+        top, bottom, left, right = self.bounds[pin]
+        self.bounds[pin] = (min(top, i), max(bottom, i), min(left, j), max(right, j))
+
+    def remove(self, pin, cell):
+        i, j = cell
+        self[pin].remove([i, j])
+        if not self[pin]:
+            del self[pin], self.sums[pin], self.bounds[pin]
+            return
+
+        self.sums[pin][0] -= i
+        self.sums[pin][1] -= j
+        if i in self.bounds[pin][:2] or j in self.bounds[pin][2:]:
+            rows, cols = np.array(self[pin]).T
+            self.bounds[pin] = (int(rows.min()), int(rows.max()), int(cols.min()), int(cols.max()))
+
+    def edit(self, cell, old, new):
+        if old == new: return
+        if old > 0: self.remove(old, cell)
+        if new > 0: self.add(new, cell)
+
+    def flat(self, pin):
+        return compact_route(np.array(self[pin]) @ (self.width, 1))
+
+    def center(self, pin):
+        return [int(self.sums[pin][0]/len(self[pin])), int(self.sums[pin][1]/len(self[pin]))]
+
+    def bbox(self, pin): return self.bounds[pin]
+
+class ProximityIndex:
+
+    def __init__(self, shape, pins, radius = 2):
+        self.pins = pins
+        self.radius = radius
+        self.claimed = set()
+
+        self.labels = np.zeros(shape, dtype=CELL_DTYPE)
+        for pin, cells in pins.items():
+            rows, cols = np.array(cells, dtype=np.int64).T
+            self.labels[rows, cols] = pin
+
+        self.high = np.zeros(shape, dtype=CELL_DTYPE)
+        self.low = np.zeros(shape, dtype=CELL_DTYPE)
+        self.refresh(0, shape[0], 0, shape[1])
+
+    def refresh(self, top, bottom, left, right):
+        window, _, high, low = label_extent(self.labels, lambda mat: mat > 0, self.radius, top, bottom, left, right)
+        self.high[window], self.low[window] = high, low
+
+    def claim(self, pins):
+        for pin in set(pins) - self.claimed:
+            self.claimed.add(pin)
+            rows, cols = np.array(self.pins[pin], dtype=np.int64).T
+            self.labels[rows, cols] = EMPTY
+            self.refresh(rows.min() - self.radius, rows.max() + self.radius + 1, cols.min() - self.radius, cols.max() + self.radius + 1)
+
+    def near(self, route, pins):
+        route = np.asarray(route, dtype=np.int64)
+        high, low = self.high.ravel()[route], self.low.ravel()[route]
+        found = set(np.unique(high[(high == low) & (high > 0)]).tolist())
+
+        mixed = route[(high != low) & (high != np.iinfo(CELL_DTYPE).min)]
+        for i, j in zip(*np.divmod(mixed, self.labels.shape[1])):
+            window = self.labels[max(i - self.radius, 0):i + self.radius + 1, max(j - self.radius, 0):j + self.radius + 1]
+            found.update(np.unique(window[window > 0]).tolist())
+
+        return found & set(pins)
@@ -0,0 +1,192 @@
+from collections import OrderedDict
+import numpy as np
+from my_board import DIRECTIONS, compact_route
+
+FIELD_DTYPE = np.uint8
+
+UNREACHED = 0
+FIELD_ORIGIN = len(DIRECTIONS) + 1
+BLOCKED = len(DIRECTIONS) + 2
+
+BACK_CODES = np.array([(k ^ 1) + 1 for k in range(len(DIRECTIONS))], dtype=FIELD_DTYPE)
+STEP_ORDER = (2, 3, 0, 1)
+RESULTANTS = np.array([[sum(DIRECTIONS[k][axis] for k in range(len(DIRECTIONS)) if bits >> k & 1) for axis in (0, 1)]
+                       for bits in range(1 << len(DIRECTIONS))], dtype=np.int64)
+
+_zobrist = {}
+
+def is_step(code): return UNREACHED < code < FIELD_ORIGIN
+def step_of(code): return DIRECTIONS[code - 1]
+
+def zobrist_keys(shape):
+    if shape not in _zobrist:
+        _zobrist[shape] = np.random.default_rng(shape).integers(0, 2**64, shape[0]*shape[1], dtype=np.uint64, endpoint=False)
+    return _zobrist[shape]
+
+class FieldCache:
+
+    def __init__(self, max_entries = 1024, max_bytes = 256 << 20, min_fraction = 1/8):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_fraction = min_fraction
+
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, codes, dist):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+
+        self.entries[key] = codes.copy(), dist.copy()
+        self.bytes += codes.nbytes + dist.nbytes
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (old_codes, old_dist) = self.entries.popitem(last=False)
+            self.bytes -= old_codes.nbytes + old_dist.nbytes
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+class VectorField:
+
+    def __init__(self, shape, origin, pin_nr):
+        self.shape = shape
+        self.origin = origin[0]*shape[1] + origin[1]
+        self.pin_nr = pin_nr
+        self.offsets = np.array([di*shape[1] + dj for di, dj in DIRECTIONS], dtype=np.int64)
+
+        self.codes = np.full(shape[0]*shape[1], BLOCKED, dtype=FIELD_DTYPE)
+        self.dist = np.full(shape[0]*shape[1], -1, dtype=np.int32)
+        self.mask_hash = np.zeros(1, dtype=np.uint64)
+        self.expanded = 0
+
+    @property
+    def grid(self): return self.codes.reshape(self.shape)
+
+    @property
+    def key(self): return self.shape, self.origin, int(self.mask_hash[0])
+
+    def build(self, free, cache = None):
+        free = free.ravel()
+        self.mask_hash[0] = np.bitwise_xor.reduce(zobrist_keys(self.shape)[~free])
+        cached = cache.get(self.key) if cache is not None else None
+        if cached is not None:
+            self.codes[:], self.dist[:] = cached
+            return
+
+        self.codes[:] = np.where(free, UNREACHED, BLOCKED)
+        self.dist[:] = -1
+        self.codes[self.origin] = FIELD_ORIGIN
+        self.dist[self.origin] = 0
+        self.flood(np.array([self.origin], dtype=np.int64))
+        if cache is not None: cache.put(self.key, self.codes, self.dist)
+
+    def repair(self, keepout, touched, cache = None):
+        touched = touched[(self.codes[touched] != BLOCKED) & (self.codes[touched] != FIELD_ORIGIN)]
+        blocked = touched[~keepout.free_at(self.pin_nr, touched)]
+        if not blocked.size: return False
+
+        keepout.journal.record(self.mask_hash, 0)
+        self.mask_hash[0] ^= np.bitwise_xor.reduce(zobrist_keys(self.shape)[blocked])
+
+        lost = self.subtree(blocked[self.dist[blocked] > 0])
+        bulky = cache is not None and lost.size >= cache.min_fraction*self.codes.size
+        cached = cache.get(self.key) if bulky else None
+        if cached is not None:
+            keepout.journal.record(self.codes, slice(None))
+            keepout.journal.record(self.dist, slice(None))
+            self.codes[:], self.dist[:] = cached
+            return True
+
+        keepout.journal.record(self.codes, blocked)
+        self.codes[blocked] = BLOCKED
+        if not lost.size: return True
+
+        keepout.journal.record(self.codes, lost)
+        keepout.journal.record(self.dist, lost)
+        self.dist[lost] = -1
+        self.codes[lost] = np.where(keepout.free_at(self.pin_nr, lost), UNREACHED, BLOCKED)
+
+        reopened = lost[self.codes[lost] == UNREACHED]
+        seeds = (reopened[:, None] + self.offsets).ravel()
+        self.flood(seeds[self.dist[seeds] >= 0])
+        if bulky: cache.put(self.key, self.codes, self.dist)
+        return True
+
+    def subtree(self, roots):
+        found = [roots]
+        while roots.size:
+            neighbours = roots[:, None] + self.offsets
+            roots = neighbours[self.codes[neighbours] == BACK_CODES]
+            found.append(roots)
+        return np.concatenate(found)
+
+    def flood(self, seeds):
+        seeds = seeds[np.argsort(self.dist[seeds], kind="stable")]
+        frontier, grown = seeds[:0], []
+        level = 0
+
+        while frontier.size or seeds.size:
+            if not frontier.size: level = self.dist[seeds[0]]
+            joining = np.searchsorted(self.dist[seeds], level, side="right")
+            frontier, seeds = np.concatenate((frontier, seeds[:joining])), seeds[joining:]
+
+            candidates = (frontier[:, None] + self.offsets).ravel()
+            candidates = candidates[(self.codes[candidates] == UNREACHED) & (self.dist[candidates] < 0)]
+            frontier = self.distinct(candidates)
+            level += 1
+            self.dist[frontier] = level
+            grown.append(frontier)
+
+        if not grown: return
+        grown = np.concatenate(grown)
+        self.expanded += grown.size
+        self.point(grown)
+
+    def distinct(self, cells):
+        tags = -2 - np.arange(cells.size, dtype=np.int32)
+        self.dist[cells] = tags
+        return cells[self.dist[cells] == tags]
+
+    def point(self, cells):
+        expected = self.dist[cells] - 1
+        codes = np.zeros(cells.size, dtype=FIELD_DTYPE)
+        for k in reversed(STEP_ORDER):
+            codes[self.dist[cells + self.offsets[k]] == expected] = k + 1
+        self.codes[cells] = codes
+
+class NetField:
+
+    def __init__(self, fields):
+        self.key = tuple(field.key for field in fields)
+        self.codes = np.stack([field.codes for field in fields])
+        self.steps = fields[0].offsets
+
+        stepping = (self.codes > UNREACHED) & (self.codes < FIELD_ORIGIN)
+        bits = np.bitwise_or.reduce(np.where(stepping, np.left_shift(1, self.codes.astype(np.int64) - 1), 0), axis=0)
+        self.resultant = (RESULTANTS @ (fields[0].shape[1], 1))[bits]
+
+    def trace(self, start):
+        rows = np.arange(len(self.codes))
+        cells = [np.full(rows.size, start, dtype=np.int64)]
+        while True:
+            codes = self.codes[rows, cells[-1]]
+            moving = codes != FIELD_ORIGIN
+            if not moving.any(): return compact_route(np.concatenate(cells))
+            codes = codes[moving]
+            if np.any((codes == UNREACHED) | (codes > FIELD_ORIGIN)): return None
+            rows = rows[moving]
+            cells.append(cells[-1][moving] + self.steps[codes - 1])
@@ -0,0 +1,29 @@
+import numpy as np
+from my_board import CELL_DTYPE, EMPTY, ZPIN
+
+def generate_board(height, width = None, nets = 6, terminals = 2, zpins = 0.01, clustering = 0.0, seed = 0, spacing = 2):
+    width = width or height
+    rng = np.random.default_rng(seed)
+    mat = np.full((height, width), EMPTY, dtype=CELL_DTYPE)
+    taken = np.zeros((height, width), dtype=bool)
+
+    def place(i, j, val):
+        if not (0 <= i < height and 0 <= j < width) or taken[i, j]: return False
+        mat[i, j] = val
+        taken[max(i - spacing, 0):i + spacing + 1, max(j - spacing, 0):j + spacing + 1] = True
+        return True
+
+    spread = max(2.0, (1 - clustering)*max(height, width)/2)
+    for net in range(1, nets + 1):
+        center = rng.uniform((0, 0), (height, width))
+        placed, attempts = 0, 0
+        while placed < terminals and attempts < 100*terminals:
+            i, j = np.rint(rng.normal(center, spread)).astype(int)
+            placed += place(i, j, net)
+            attempts += 1
+
+    for _ in range(int(zpins*height*width)):
+        i, j = rng.integers((0, 0), (height, width))
+        place(i, j, ZPIN)
+
+    return mat
@@ -0,0 +1,103 @@
+from itertools import islice
+import json
+import struct
+import numpy as np
+from my_board import CELL_DTYPE, CODES, PinIndex, decode_cell
+
+MAGIC = b"ARBOARD\n"
+VERSION = 1
+ALIGN = 64
+BINARY_SUFFIX = ".arb"
+
+def parse_rows(text):
+    text = text.rstrip("\n")
+    if not text: return np.zeros((0, 0), dtype=CELL_DTYPE)
+    chars = np.frombuffer(text.encode(), dtype=np.uint8)
+    ends = np.append(np.flatnonzero(chars == ord("\n")), chars.size)
+    separators = np.diff(np.searchsorted(np.flatnonzero(chars == ord(",")), ends), prepend=0)
+    rows, width = ends.size, int(separators[0]) + 1
+    if np.any(separators != width - 1): raise ValueError(f"board rows differ in length, expected {width} cells per row")
+
+    for symbol, code in CODES.items(): text = text.replace(symbol, str(code))
+    values = np.fromstring(text.replace("\n", ","), dtype=np.int64, sep=",")
+    if values.size != rows*width: raise ValueError("board has empty cells")
+
+    limits = np.iinfo(CELL_DTYPE)
+    if values.size and (values.min() < limits.min or values.max() > limits.max): raise ValueError("cell value out of range")
+    return values.astype(CELL_DTYPE).reshape(rows, width)
+
+def iter_board(path, chunk_rows = 4096):
+    with open(path) as file:
+        while True:
+            lines = "".join(islice(file, chunk_rows))
+            if not lines: return
+            yield parse_rows(lines)
+
+def read_board(path, chunk_rows = None):
+    if chunk_rows is None:
+        with open(path) as file: return parse_rows(file.read())
+    return np.concatenate(list(iter_board(path, chunk_rows)))
+
+def format_rows(mat, names, low):
+    return "".join(",".join(row) + "\n" for row in names[mat.astype(np.intp) - low].tolist())
+
+def write_board(path, mat, chunk_rows = 1024):
+    low, high = (min(int(mat.min()), 0), int(mat.max())) if mat.size else (0, 0)
+    names = np.array([str(decode_cell(val)) for val in range(low, high + 1)], dtype=object)
+
+    with open(path, "w") as file:
+        for start in range(0, len(mat), chunk_rows):
+            file.write(format_rows(mat[start:start + chunk_rows], names, low))
+
+def net_table(mat):
+    pins = PinIndex(mat)
+    return [[pin, len(pins[pin]), *pins.bounds[pin]] for pin in sorted(pins)]
+
+def write_binary(path, mat, layers = None):
+    layers = {"cells": mat, **(layers or {})}
+    arrays = [np.ascontiguousarray(layer, dtype=CELL_DTYPE) for layer in layers.values()]
+    if any(array.shape != mat.shape for array in arrays): raise ValueError("route layers must match the board shape")
+
+    header = json.dumps({"version": VERSION, "dtype": np.dtype(CELL_DTYPE).str, "shape": list(mat.shape),
+                         "layers": list(layers), "nets": net_table(mat)}).encode()
+    header += b" "*(-(len(MAGIC) + 4 + len(header)) % ALIGN)
+
+    with open(path, "wb") as file:
+        file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for array in arrays: file.write(array.tobytes())
+
+class BoardFile:
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC: raise ValueError(f"{path} is not a binary board file")
+            length, = struct.unpack("<I", file.read(4))
+            header = json.loads(file.read(length))
+
+        if header["version"] > VERSION: raise ValueError(f"board file version {header['version']} is newer than {VERSION}")
+        self.version = header["version"]
+        self.dtype = np.dtype(header["dtype"])
+        self.shape = tuple(header["shape"])
+        self.layers = header["layers"]
+        self.nets = {net: (count, tuple(bounds)) for net, count, *bounds in header["nets"]}
+        self.offset = len(MAGIC) + 4 + length
+        self.maps = {}
+
+    def layer(self, name = "cells"):
+        if name not in self.maps:
+            start = self.offset + self.layers.index(name)*self.shape[0]*self.shape[1]*self.dtype.itemsize
+            self.maps[name] = np.memmap(self.path, self.dtype, "r", start, self.shape)
+        return self.maps[name]
+
+    def window(self, top = 0, bottom = None, left = 0, right = None, name = "cells"):
+        return np.array(self.layer(name)[top:bottom, left:right], dtype=CELL_DTYPE)
+
+def read_binary(path, layer = "cells"):
+    return BoardFile(path).window(name=layer)
+
+def csv_to_binary(source, target, chunk_rows = None):
+    write_binary(target, read_board(source, chunk_rows))
+
+def binary_to_csv(source, target, layer = "cells"):
+    write_board(target, BoardFile(source).layer(layer))
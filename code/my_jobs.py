@@ -0,0 +1,81 @@
+import threading
+import time
+
+class Job:
+
+    def __init__(self, key, func, done):
+        self.key = key
+        self.func = func
+        self.done = done
+
+        self.cancel = threading.Event()
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.started = time.monotonic()
+        self.finished = None
+        self.thread = None
+
+    def run(self):
+        try: self.result = self.func(self)
+        except Exception as error: self.error = error
+        self.finished = time.monotonic()
+
+    def report(self, **progress): self.progress = progress
+
+    def elapsed(self): return (self.finished or time.monotonic()) - self.started
+
+class JobManager:
+
+    def __init__(self, post):
+        self.post = post
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key, func, done = None):
+        with self.lock:
+            if key in self.jobs: return None
+            job = self.jobs[key] = Job(key, func, done)
+
+        job.thread = threading.Thread(target=self.execute, args=(job,), daemon=True)
+        job.thread.start()
+        return job
+
+    def execute(self, job):
+        job.run()
+        self.post(self.complete, job)
+
+    def complete(self, job):
+        with self.lock:
+            if self.jobs.get(job.key) is job: del self.jobs[job.key]
+        if job.done: job.done(job)
+
+    def running(self, key): return self.jobs.get(key)
+
+    def cancel(self, key, wait = False):
+        job = self.jobs.get(key)
+        if job is None: return False
+        job.cancel.set()
+        if wait: job.thread.join()
+        return True
+
+class DrawQueue:
+
+    def __init__(self, post, draw):
+        self.post = post
+        self.draw = draw
+        self.pending = []
+        self.posted = False
+        self.lock = threading.Lock()
+
+    def __call__(self, *param, **kargs):
+        with self.lock:
+            if "matrix" in kargs: self.pending = []
+            self.pending.append((param, kargs))
+            if self.posted: return
+            self.posted = True
+        self.post(self.flush)
+
+    def flush(self):
+        with self.lock: pending, self.pending, self.posted = self.pending, [], False
+        for param, kargs in pending: self.draw(*param, **kargs)
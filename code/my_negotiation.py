@@ -0,0 +1,76 @@
+import numpy as np
+from my_routers import MazeRouter
+
+class Negotiation:
+
+    def __init__(self, solver, keepout, iterations = 100, present = 0.5, growth = 1.3, history = 1.0):
+        self.solver = solver
+        self.keepout = keepout
+        self.iterations = iterations
+        self.present = present
+        self.growth = growth
+        self.history = history
+
+        self.presence = np.zeros(keepout.mat.size, dtype=np.int32)
+        self.costs = np.zeros(keepout.mat.size)
+        self.trees = {}
+        self.halos = {}
+        self.passable = {}
+
+    def halo(self, cells):
+        halo = np.unique(cells[:, None] + self.keepout.ring)
+        return halo[(halo >= 0) & (halo < self.presence.size)]
+
+    def rip_up(self, pin):
+        if pin in self.halos: self.presence[self.halos.pop(pin)] -= 1
+        self.trees.pop(pin, None)
+
+    def reroute(self, pin, present):
+        self.rip_up(pin)
+        width = self.keepout.mat.shape[1]
+        if pin not in self.passable:
+            self.passable[pin] = (self.keepout.free_mask(pin) | (self.keepout.mat == pin)).ravel()
+
+        weight = ((1 + self.costs)*(1 + present*self.presence)).tolist()
+        terminals = [i*width + j for i, j in self.solver.pins[pin]]
+        tree = MazeRouter.tree(terminals, terminals[0], self.passable[pin], width, weight)
+        self.solver.budget.spend()
+        if tree is None: return
+
+        self.trees[pin] = np.array(sorted(tree), dtype=np.int64)
+        self.halos[pin] = self.halo(self.trees[pin])
+        self.presence[self.halos[pin]] += 1
+
+    def congested(self):
+        return sorted(pin for pin, cells in self.trees.items() if np.any(self.presence[cells] > 1))
+
+    def run(self, pins):
+        pending, present = sorted(pins), self.present
+        for _ in range(self.iterations):
+            for pin in pending:
+                if self.solver.budget.exhausted(): break
+                self.reroute(pin, present)
+
+            pending = self.congested()
+            if not pending or self.solver.budget.exhausted(): break
+            for pin in pending:
+                cells = self.trees[pin]
+                self.costs[self.halo(cells[self.presence[cells] > 1])] += self.history
+            present *= self.growth
+
+        return self.commit(pins)
+
+    def commit(self, pins):
+        accepted = np.zeros(self.presence.size, dtype=bool)
+        routed = set()
+
+        for pin in sorted(self.trees, key=lambda pin: (self.trees[pin].size, pin)):
+            cells = self.trees[pin]
+            if accepted[cells].any(): continue
+            accepted[self.halos[pin]] = True
+            self.keepout.write(cells, pin)
+            routed.add(pin)
+
+        self.keepout.journal.clear()
+        self.solver.budget.finish(routed, True)
+        return set(pins) - routed
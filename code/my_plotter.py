@@ -14,6 +14,8 @@ class MatrixDisplay(wx.Control):
         self.matrix = [[0 for _ in range(5)] for _ in range(5)]
         self.pin_to_draw = 0
         self.prev_cell = []
+        self.violations = set()
+        self.edit_hook = None
 
         self.is_highlighted = False
 
@@ -39,7 +41,15 @@ class MatrixDisplay(wx.Control):
             self.matrix[i][j] = val
             self.draw_cell(wx.ClientDC(self),val,i,j)
         
-        if "matrix" in kargs: self.matrix = kargs["matrix"]; self.resize(); self.UpdateDrawing()
+        if "matrix" in kargs: self.matrix = kargs["matrix"]; self.violations = set(); self.resize(); self.UpdateDrawing()
+
+    def set_edit_hook(self, hook): self.edit_hook = hook
+
+    def show_violations(self, cells):
+        cells = set(cells)
+        changed = cells ^ self.violations
+        self.violations = cells
+        for i, j in changed: self.draw_cell(wx.ClientDC(self), self.matrix[i][j], i, j)
 
     def DoGetBestClientSize(self):
         return self.GetSize()
@@ -68,6 +78,7 @@ class MatrixDisplay(wx.Control):
         if self.prev_cell:
             self.matrix[self.prev_cell[0]
                         ][self.prev_cell[1]] = self.pin_to_draw
+            if self.edit_hook: self.edit_hook(*self.prev_cell, self.pin_to_draw)
             self.prev_cell = []
 
     def OnInside(self, e):
@@ -172,6 +183,8 @@ class MatrixDisplay(wx.Control):
         elif val == 0:
             rec_col = wx.Brush(self.GetBackgroundColour())
 
+        if (i, j) in self.violations: rec_col = wx.RED_BRUSH
+
         dc.SetBrush(rec_col)
         dc.DrawRectangle(j*self.cell_size, i*self.cell_size,
                          self.cell_size, self.cell_size)
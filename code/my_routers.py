@@ -0,0 +1,162 @@
+import heapq
+import numpy as np
+from my_board import DIRECTIONS, compact_route, dilate
+
+class ElasticRouter:
+
+    needs_fields = True
+
+    def route(self, solver, keepout, pin_nr, start):
+        return solver.generate_elastic_path(pin_nr, *start)
+
+class MazeRouter:
+
+    needs_fields = False
+
+    def route(self, solver, keepout, pin_nr, start):
+        mat = keepout.mat
+        width = mat.shape[1]
+        passable = (keepout.free_mask(pin_nr) | (mat == pin_nr)).ravel()
+
+        terminals = [i*width + j for i, j in solver.pins[pin_nr]]
+        seed = self.nearest(terminals, (start[0] % mat.shape[0])*width + start[1] % width, width)
+        tree = self.tree(terminals, seed, passable, width)
+        return None if tree is None else compact_route(list(tree))
+
+    @staticmethod
+    def nearest(terminals, cell, width):
+        return min(terminals, key=lambda terminal: abs(terminal//width - cell//width) + abs(terminal%width - cell%width))
+
+    @staticmethod
+    def tree(terminals, seed, passable, width, weight = None):
+        offsets = [di*width + dj for di, dj in DIRECTIONS]
+        tree = {seed}
+        for target in sorted(terminals, key=lambda cell: abs(cell//width - seed//width) + abs(cell%width - seed%width)):
+            if target in tree: continue
+            branch = MazeRouter.search(tree, target, passable, offsets, width, weight)
+            if branch is None: return None
+            tree.update(branch)
+        return tree
+
+    @staticmethod
+    def search(sources, target, passable, offsets, width, weight = None):
+        ti, tj = divmod(target, width)
+        def h(cell): return abs(cell//width - ti) + abs(cell%width - tj)
+
+        parent = {cell: None for cell in sources}
+        cost = dict.fromkeys(sources, 0)
+        heap = [(h(cell), h(cell), cell) for cell in sorted(sources)]
+        heapq.heapify(heap)
+
+        while heap:
+            f, _, cell = heapq.heappop(heap)
+            if cell == target:
+                branch = []
+                while cell is not None:
+                    branch.append(cell)
+                    cell = parent[cell]
+                return branch
+            if f > cost[cell] + h(cell): continue
+
+            for offset in offsets:
+                nxt = cell + offset
+                if not passable[nxt]: continue
+                g = cost[cell] + (1 if weight is None else weight[nxt])
+                if cost.get(nxt, g + 1) <= g: continue
+                cost[nxt], parent[nxt] = g, cell
+                heapq.heappush(heap, (g + h(nxt), h(nxt), nxt))
+
+        return None
+
+class CoarseRouter(MazeRouter):
+
+    def __init__(self, tile = 4, margin = 1):
+        self.tile = tile
+        self.margin = margin
+
+    def route(self, solver, keepout, pin_nr, start):
+        mat = keepout.mat
+        pins = solver.pins[pin_nr]
+        full = keepout.free_mask(pin_nr) | (mat == pin_nr)
+        plan = self.plan(full, pins)
+
+        for margin in (self.margin, 2*self.margin + 1):
+            if plan is None: break
+            tree = self.detail(full, dilate(plan, margin), pins, start)
+            if tree is not None: return tree
+        return super().route(solver, keepout, pin_nr, start)
+
+    def detail(self, full, plan, pins, start):
+        tile = self.tile
+        plan_rows, plan_cols = np.nonzero(plan)
+        top, left = plan_rows.min()*tile, plan_cols.min()*tile
+        bottom, right = min((plan_rows.max() + 1)*tile, full.shape[0]), min((plan_cols.max() + 1)*tile, full.shape[1])
+        window = (slice(top, bottom), slice(left, right))
+
+        corridor = plan[plan_rows.min():plan_rows.max() + 1, plan_cols.min():plan_cols.max() + 1]
+        corridor = np.repeat(np.repeat(corridor, tile, axis=0), tile, axis=1)[:bottom - top, :right - left]
+        passable = np.pad(full[window] & corridor, 1).ravel()
+
+        width = right - left + 2
+        terminals = [(i - top + 1)*width + j - left + 1 for i, j in pins]
+        seed = self.nearest(terminals, (start[0] - top + 1)*width + start[1] - left + 1, width)
+        tree = self.tree(terminals, seed, passable, width)
+        if tree is None: return None
+        rows, cols = np.divmod(np.array(list(tree)), width)
+        return compact_route((rows + top - 1)*full.shape[1] + cols + left - 1)
+
+    def plan(self, passable, pins):
+        tile = self.tile
+        height, width = passable.shape
+        rows, cols = -(-height//tile), -(-width//tile)
+
+        padded = np.zeros((rows*tile, cols*tile), dtype=bool)
+        padded[:height, :width] = passable
+        east = (padded[:, tile - 1:-1:tile] & padded[:, tile::tile]).reshape(rows, tile, cols - 1).sum(axis=1)
+        south = (padded[tile - 1:-1:tile, :] & padded[tile::tile, :]).reshape(rows - 1, cols, tile).sum(axis=2)
+
+        def links(tile_nr):
+            r, c = divmod(tile_nr, cols)
+            if c + 1 < cols and east[r, c]: yield tile_nr + 1, east[r, c]
+            if c > 0 and east[r, c - 1]: yield tile_nr - 1, east[r, c - 1]
+            if r + 1 < rows and south[r, c]: yield tile_nr + cols, south[r, c]
+            if r > 0 and south[r - 1, c]: yield tile_nr - cols, south[r - 1, c]
+
+        terminals = sorted({(i//tile)*cols + j//tile for i, j in pins})
+        tree = {terminals[0]}
+        for target in terminals[1:]:
+            if target in tree: continue
+            branch = self.coarse_search(tree, target, links, cols)
+            if branch is None: return None
+            tree.update(branch)
+
+        plan = np.zeros((rows, cols), dtype=bool)
+        plan.ravel()[sorted(tree)] = True
+        return plan
+
+    def coarse_search(self, sources, target, links, cols):
+        tr, tc = divmod(target, cols)
+        def h(tile_nr): return abs(tile_nr//cols - tr) + abs(tile_nr%cols - tc)
+
+        parent = {tile_nr: None for tile_nr in sources}
+        cost = dict.fromkeys(sources, 0.0)
+        heap = [(h(tile_nr), tile_nr) for tile_nr in sorted(sources)]
+        heapq.heapify(heap)
+
+        while heap:
+            f, tile_nr = heapq.heappop(heap)
+            if tile_nr == target:
+                branch = []
+                while tile_nr is not None:
+                    branch.append(tile_nr)
+                    tile_nr = parent[tile_nr]
+                return branch
+            if f > cost[tile_nr] + h(tile_nr): continue
+
+            for nxt, capacity in links(tile_nr):
+                g = cost[tile_nr] + 1 + self.tile/capacity
+                if cost.get(nxt, g + 1) <= g: continue
+                cost[nxt], parent[nxt] = g, tile_nr
+                heapq.heappush(heap, (g + h(nxt), nxt))
+
+        return None
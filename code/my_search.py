@@ -0,0 +1,184 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import copy
+import multiprocessing
+import time
+import numpy as np
+from my_board import EMPTY, KeepOut, compact_route
+
+class Budget:
+
+    def __init__(self, time_limit = None, max_candidates = None, progress = None, cancel = None):
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.max_candidates = max_candidates
+        self.progress = progress
+        self.cancel = cancel
+        self.clusters = self.candidates = self.nets = 0
+
+    def share(self, parts = 1):
+        clone = copy.copy(self)
+        clone.progress = clone.cancel = None
+        if self.max_candidates is not None: clone.max_candidates = self.candidates + (self.max_candidates - self.candidates)//parts
+        return clone
+
+    def spend(self): self.candidates += 1
+
+    def exhausted(self):
+        if self.cancel is not None and self.cancel.is_set(): return True
+        if self.max_candidates is not None and self.candidates >= self.max_candidates: return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def finish(self, pins, routed):
+        self.clusters += 1
+        if routed: self.nets += len(pins)
+        if self.progress: self.progress(clusters=self.clusters, candidates=self.candidates, nets=self.nets)
+
+class OrderingSearch:
+
+    def __init__(self, solver, keepout, pending_pins, unchecked_pins, beam_width = None, abandon = lambda: False):
+        self.solver = solver
+        self.keepout = keepout
+        self.pending_pins = pending_pins
+        self.unchecked_pins = unchecked_pins
+        self.beam_width = beam_width
+        self.abandon = abandon
+        self.budget = solver.budget
+
+        self.failed = set()
+
+    def roots(self, starting_positions):
+        order = sorted(self.pending_pins, key=lambda pin: (self.center_length(pin), pin))
+        return [(pin, sp) for pin in order for sp in starting_positions]
+
+    def center_length(self, pin):
+        path = self.solver.route(self.keepout, pin, self.solver.compute_center(pin))
+        return float("inf") if path is None else len(path)
+
+    def accepts(self, path):
+        return path is not None and not self.solver.check_neighbroing_pins(path, self.unchecked_pins)
+
+    def run_root(self, pin, sp):
+        path = self.solver.route(self.keepout, pin, sp)
+        if not self.accepts(path): return None
+        return self.place([], pin, path)
+
+    def place(self, routes, pin, path):
+        self.budget.spend()
+        checkpoint = self.keepout.journal.checkpoint()
+        remaining = self.pending_pins.difference(route[0] for route in routes) - {pin}
+
+        touched = self.solver.commit_route(self.keepout, path, pin, self.pending_pins if remaining else ())
+        found = self.extend(routes + [(pin, path, touched)], remaining)
+        if found is None: self.keepout.journal.rollback(checkpoint)
+        return found
+
+    def extend(self, routes, remaining):
+        if not remaining: return [(pin, path) for pin, path, _ in routes], [touched for _, _, touched in routes]
+
+        state = frozenset((pin, path.tobytes()) for pin, path, _ in routes)
+        if state in self.failed: return None
+
+        children = []
+        for pin in sorted(remaining):
+            path = self.solver.route(self.keepout, pin, self.solver.compute_center(pin))
+            if self.accepts(path): children.append((len(path), pin, path))
+        children.sort(key=lambda child: child[:2])
+
+        for _, pin, path in children[:self.beam_width]:
+            if self.abandon() or self.budget.exhausted(): return None
+            found = self.place(routes, pin, path)
+            if found is not None: return found
+
+        self.failed.add(state)
+        self.solver.stats.count("deadlocks")
+        return None
+
+_worker = None
+
+def _init_worker(solver, pending_pins, unchecked_pins, best):
+    global _worker
+    keepout = KeepOut(solver.matrix, solver.clearance)
+    _worker = (OrderingSearch(solver, keepout, pending_pins, unchecked_pins, solver.beam_width), best)
+
+def _run_root(index, pin, sp):
+    search, best = _worker
+    search.abandon = lambda: 0 <= best.value < index
+    if search.abandon() or search.budget.exhausted(): return index, None, 0
+
+    spent = search.budget.candidates
+    found = search.run_root(pin, sp)
+    spent = search.budget.candidates - spent
+    if found is None: return index, None, spent
+
+    search.keepout.journal.rollback(0)
+    with best.get_lock():
+        if best.value < 0 or index < best.value: best.value = index
+    return index, found[0], spent
+
+def parallel_search(solver, roots, pending_pins, unchecked_pins, workers):
+    best = multiprocessing.Value("q", -1)
+    clone = solver.clone_for(pending_pins)
+    clone.budget = solver.budget.share(workers)
+    initargs = (clone, pending_pins, unchecked_pins, best)
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        roots = enumerate(roots)
+        running, found = {}, None
+
+        while True:
+            while found is None and len(running) < 2*workers and not solver.budget.exhausted():
+                root = next(roots, None)
+                if root is None: break
+                index, (pin, sp) = root
+                running[pool.submit(_run_root, index, pin, sp)] = index
+
+            if not running: break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, routes, spent = future.result()
+                solver.budget.candidates += spent
+                del running[future]
+                if routes is not None and (found is None or index < found[0]): found = index, routes
+
+            if found is not None:
+                for future, index in list(running.items()):
+                    if index > found[0] and future.cancel(): del running[future]
+
+    return found[1] if found else None
+
+def _route_cluster(solver, pins, origin, width):
+    solver.get_pins()
+    spent = solver.budget.candidates
+    if solver.route_nets(KeepOut(solver.matrix, solver.clearance), pins): return None, solver.budget.candidates - spent
+    routes = []
+    for pin in sorted(pins):
+        rows, cols = np.nonzero(solver.matrix == pin)
+        routes.append((pin, compact_route((rows + origin[0])*width + cols + origin[1])))
+    return routes, solver.budget.candidates - spent
+
+def merge_routes(keepout, routes):
+    checkpoint = keepout.journal.checkpoint()
+    for pin, path in routes:
+        existing = keepout.mat.ravel()[path]
+        if not np.all((existing == pin) | ((existing == EMPTY) & keepout.free_at(pin, path))):
+            keepout.journal.rollback(checkpoint)
+            return False
+        keepout.write(path, pin)
+    return True
+
+def solve_clusters(solver, keepout, clusters, workers):
+    unrouted = set()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = []
+        for pins in clusters:
+            window, origin = solver.clone_window(pins)
+            window.budget = solver.budget.share(len(clusters))
+            futures.append(pool.submit(_route_cluster, window, pins, origin, solver.matrix.shape[1]))
+
+        for pins, future in zip(clusters, futures):
+            routes, spent = future.result()
+            solver.budget.candidates += spent
+            if routes is None or not merge_routes(keepout, routes): unrouted |= pins
+            else: solver.budget.finish(pins, True)
+
+    keepout.journal.clear()
+    return unrouted
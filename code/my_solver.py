@@ -1,250 +1,332 @@
-from collections import deque
-import copy
-import csv
 from itertools import product
-import itertools
 from time import sleep
+import numpy as np
+from my_board import CELL_DTYPE, EMPTY, BORDER, KeepOut, PinIndex, ProximityIndex
+from my_board import encode_cell, encode_rows, decode_rows
+from my_io import BINARY_SUFFIX, BoardFile, read_board, write_board, write_binary
+from my_fields import UNREACHED, FieldCache, NetField, VectorField, is_step
+from my_routers import ElasticRouter, MazeRouter
+from my_stats import Stats
+from my_validation import Validator
+from my_negotiation import Negotiation
+from my_search import Budget, OrderingSearch, parallel_search, solve_clusters
 
 class Solver:
 
     def __init__(self):
 
-        self.matrix = []
-        self.directions = [[0, -1],[0, 1],[1, 0],[-1, 0] ]
-        self.pins = {}
+        self.matrix = np.zeros((0, 0), dtype=CELL_DTYPE)
+        self.pins = PinIndex()
 
         self.drawing_func = None
 
         self.fields = {}
-        self.fields_backup = {}
+        self.net_fields = {}
+        self.proximity = None
+        self.router = ElasticRouter()
+        self.field_cache = FieldCache()
+
+        self.clearance = 1
+        self.workers = 1
+        self.cluster_workers = 1
+        self.beam_width = None
+        self.window_margin = 8
+        self.budget = Budget()
+        self.unrouted = []
+        self.validator = Validator()
+        self.stats = Stats()
 
     def set_hook(self, hook): self.drawing_func = hook
-    def set_matrix(self,matrix): self.matrix = self.border_matrix(matrix)
-    
+    def instrument(self, enabled = True, sink = None): self.stats = Stats(enabled, sink)
+    def set_matrix(self,matrix):
+        self.matrix = self.border_matrix(matrix)
+        self.get_pins()
+
+    def set_cell(self,i,j,val):
+        val = encode_cell(val)
+        self.pins.edit((i,j),int(self.matrix[i,j]),val)
+        self.matrix[i,j] = val
+        self.validator.touch((i-1,j-1))
+
     @staticmethod
     def border_matrix(mat):
-        new_mat = []
-        new_mat.append(["B" for _ in range(len(mat[0])+2)])
-        for row in mat: new_mat.append(["B"] + row + ["B"])
-        new_mat.append(["B" for _ in range(len(mat[0])+2)])
+        if not isinstance(mat, np.ndarray): mat = encode_rows(mat)
+        new_mat = np.full((mat.shape[0]+2, mat.shape[1]+2), BORDER, dtype=CELL_DTYPE)
+        Solver.trim_matrix(new_mat)[:] = mat
         return new_mat
 
     @staticmethod
     def trim_matrix(mat):
-        return [row[1:-1] for row in mat[1:-1]]
+        return mat[1:-1, 1:-1]
 
     def reset_states(self):
-        self.matrix = []
-        self.pins = {}
+        self.matrix = np.zeros((0, 0), dtype=CELL_DTYPE)
+        self.pins = PinIndex()
+        self.stats.reset()
+
+    def draw_matrix(self):
+        self.drawing_func(matrix = decode_rows(Solver.trim_matrix(self.matrix)))
 
     def generate_empty_matrix(self,dim):
         self.reset_states()
-        self.matrix = [[0 for _ in range(dim[0])] for _ in range(dim[1])]
-        self.matrix = Solver.border_matrix(self.matrix)
-        self.drawing_func(matrix = Solver.trim_matrix(self.matrix))
+        self.matrix = Solver.border_matrix(np.zeros((dim[1], dim[0]), dtype=CELL_DTYPE))
+        self.get_pins()
+        self.draw_matrix()
 
     def read_from_csv(self, path):
         self.reset_states()
 
-        with open(path) as file:
-            csvreader = csv.reader(file)
-            for row in csvreader:
-                self.matrix.append([int(i) if i != "Z" else "Z" for i in row])
+        self.matrix = Solver.border_matrix(read_board(path))
+        self.get_pins()
+
+        self.draw_matrix()
 
-        self.matrix = Solver.border_matrix(self.matrix)
-        self.drawing_func(matrix = Solver.trim_matrix(self.matrix))
-        
     def write_to_csv(self, path):
-        with open(path,"w") as file:
-            for row in Solver.trim_matrix(self.matrix):
-                for el in row[:-1]:
-                    file.write(str(el)+",")
-                file.write(str(row[-1]) + "\n")
+        write_board(path,Solver.trim_matrix(self.matrix))
+
+    def read_from_binary(self, path, window = ()):
+        self.reset_states()
+
+        self.matrix = Solver.border_matrix(BoardFile(path).window(*window))
+        self.get_pins()
+
+        self.draw_matrix()
+
+    def write_to_binary(self, path, layers = None):
+        write_binary(path,Solver.trim_matrix(self.matrix),layers)
+
+    def read_from_file(self, path):
+        if path.endswith(BINARY_SUFFIX): self.read_from_binary(path)
+        else: self.read_from_csv(path)
 
     def get_pins(self):
-        for i,row in enumerate(self.matrix):
-            for j,el in enumerate(row):
-                if not isinstance(el, int) or el == 0: continue
-                if not el in self.pins: self.pins[el] = []
-                self.pins[el].append([i,j])
-
-    def generate_vector_fields(self):
-        for pin in self.pins:
-            for pin_poz in self.pins[pin]:
-                self.fields[tuple(pin_poz)] = self.generate_one_vector_field(pin_poz,copy.deepcopy(self.matrix))
-
-    def generate_one_vector_field(self,pin_position,field_matrix):
-        
-        pin_nr = field_matrix[pin_position[0]][pin_position[1]]
-        self.prepare_matrix(field_matrix,pin_nr,pin_position[0],pin_position[1])
-        field_matrix[pin_position[0]][pin_position[1]] = "F"
-
-        q = deque()
-        q.appendleft(pin_position)
-
-        while q:
-            next_node = q.pop()
-            for dir in self.directions:
-                new_node = [n + d for n,d in zip(next_node,dir)]
-                if field_matrix[new_node[0]][new_node[1]] in (0,pin_nr):
-                    field_matrix[new_node[0]][new_node[1]] = [-i for i in dir]
-                    q.appendleft(new_node)
-
-        return field_matrix
-
-    def prepare_matrix(self,mtx,pin_nr,poz_i,poz_j):
-        for i, row in enumerate(mtx):
-            for j, val in enumerate(row):
-                if i == poz_i and j == poz_j: continue
-                if val == pin_nr: mtx[i][j] = "B"; continue
-                if val not in (0,"B"):
-                    for ir,jr in product([-1, 0, 1],[-1, 0, 1]):
-                        mtx[i+ir][j+jr] = "B" if mtx[i+ir][j+jr] == 0 else mtx[i+ir][j+jr]
+        with self.stats.phase("get_pins"):
+            self.pins = PinIndex(self.matrix)
+        self.validator.invalidate()
+
+    def route(self,keepout,pin_nr,start):
+        return self.router.route(self,keepout,pin_nr,start)
+
+    def generate_vector_fields(self,keepout = None,pins = None):
+        keepout = keepout or KeepOut(self.matrix,self.clearance)
+        with self.stats.phase("fields"):
+            for pin in self.pins if pins is None else pins:
+                for pin_poz in self.pins[pin]:
+                    self.fields[tuple(pin_poz)] = self.generate_one_vector_field(pin_poz,keepout)
+
+    def generate_one_vector_field(self,pin_position,keepout):
+        field = VectorField(keepout.mat.shape,pin_position,int(keepout.mat[pin_position[0],pin_position[1]]))
+        field.build(keepout.free_mask(field.pin_nr),self.field_cache)
+        self.stats.count("fields_built")
+        self.stats.count("cells_expanded",field.expanded)
+        return field
+
+    def repair_vector_fields(self,keepout,touched,pins):
+        if not self.router.needs_fields: return
+        with self.stats.phase("fields"):
+            for pin in pins:
+                for pin_poz in self.pins[pin]:
+                    field = self.fields[tuple(pin_poz)]
+                    expanded = field.expanded
+                    if field.repair(keepout,touched,self.field_cache): self.stats.count("fields_repaired")
+                    self.stats.count("cells_expanded",field.expanded - expanded)
+
+    def commit_route(self,keepout,path,pin_nr,pins):
+        touched = keepout.write(path,pin_nr)
+        self.repair_vector_fields(keepout,touched,pins)
+        return touched
+
+    def clone_for(self,pins):
+        clone = Solver()
+        clone.matrix, clone.pins = self.matrix, self.pins
+        clone.clearance, clone.beam_width = self.clearance, self.beam_width
+        clone.proximity, clone.router, clone.budget = self.proximity, self.router, self.budget.share()
+        clone.stats = self.stats
+        if self.router.needs_fields:
+            clone.fields = {tuple(pin_poz): self.fields[tuple(pin_poz)] for pin in pins for pin_poz in self.pins[pin]}
+        return clone
+
+    def clone_window(self,pins):
+        bounds = np.array([self.pins.bbox(pin) for pin in pins])
+        pad = self.window_margin + self.clearance
+        top,left = max(bounds[:,0].min()-pad,0),max(bounds[:,2].min()-pad,0)
+        window = self.matrix[top:bounds[:,1].max()+pad+1, left:bounds[:,3].max()+pad+1].copy()
+
+        ring = np.ones(window.shape,dtype=bool)
+        ring[self.clearance:-self.clearance, self.clearance:-self.clearance] = False
+        window[ring & (window == EMPTY)] = BORDER
+
+        clone = Solver()
+        clone.matrix = window
+        clone.clearance, clone.beam_width, clone.router = self.clearance, self.beam_width, self.router
+        clone.budget = self.budget.share()
+        self.stats.count("copies")
+        return clone,(int(top),int(left))
+
+    def find_clusters(self,keepout,pins):
+        parent = {pin: pin for pin in pins}
+        def find(pin):
+            while parent[pin] != pin:
+                parent[pin] = parent[parent[pin]]
+                pin = parent[pin]
+            return pin
+
+        with self.stats.phase("cluster_growth"):
+            for pin in pins:
+                near = self.check_neighbroing_pins(self.pins.flat(pin),pins)
+                path = self.route(keepout,pin,self.compute_center(pin))
+                if path is not None: near |= self.check_neighbroing_pins(path,pins)
+                for other in near: parent[find(other)] = find(pin)
+
+        clusters = {}
+        for pin in sorted(pins): clusters.setdefault(find(pin),set()).add(pin)
+        return list(clusters.values())
 
     def check_neighbroing_pins(self,paths,pins):
-        neighbor_pins = set()
-        for node in paths:
-            for ir,jr in product([-2,-1, 0, 1,2],[-2,-1, 0, 1,2]):
-                if self.matrix[node[0]+ir][node[1]+jr] in pins:
-                    neighbor_pins.add(self.matrix[node[0]+ir][node[1]+jr])
-
-        return neighbor_pins
+        return self.proximity.near(paths,pins)
 
     def compute_center(self,pin):
-        return [int(sum(el[0] for el in self.pins[pin] )/len(self.pins[pin])),int(sum(el[1] for el in self.pins[pin] )/len(self.pins[pin]))]
+        return self.pins.center(pin)
+
+    def solve(self,router = None,time_limit = None,max_candidates = None,progress = None,strategy = "search",cancel = None):
+
+        if strategy == "negotiate" and router is not None and type(router) is not MazeRouter:
+            raise ValueError(f"negotiated routing grows maze trees and cannot use {type(router).__name__}")
+        self.stats.reset()
+        self.router = router or self.router
+        self.budget = Budget(time_limit,max_candidates,progress,cancel)
+        keepout = KeepOut(self.matrix,self.clearance)
+        pins = set(self.pins)
+        hits,misses = self.field_cache.hits,self.field_cache.misses
+
+        if strategy == "negotiate":
+            with self.stats.phase("search"):
+                self.unrouted = sorted(Negotiation(self,keepout).run(pins))
+        else:
+            if self.cluster_workers > 1:
+                self.prepare_routing(keepout,pins)
+                clusters = self.find_clusters(keepout,pins)
+                if len(clusters) > 1: pins = solve_clusters(self,keepout,clusters,self.cluster_workers)
+            self.unrouted = sorted(self.route_nets(keepout,pins))
+
+        self.stats.count("candidates",self.budget.candidates)
+        self.stats.count("copies",keepout.journal.copies)
+        self.stats.count("cache_hits",self.field_cache.hits - hits)
+        self.stats.count("cache_misses",self.field_cache.misses - misses)
+        self.stats.emit(nets=len(self.pins),unrouted=self.unrouted,strategy=strategy,
+                        router="MazeRouter" if strategy == "negotiate" else type(self.router).__name__)
+        self.get_pins()
+        self.draw_matrix()
+        return self.unrouted
 
-    def solve(self):
+    def prepare_routing(self,keepout,pins):
+        self.proximity = ProximityIndex(self.matrix.shape,self.pins,2*self.clearance)
+        self.proximity.claim(set(self.pins) - set(pins))
+        if self.router.needs_fields: self.generate_vector_fields(keepout,pins)
 
-        self.get_pins()
-        self.generate_vector_fields()
+    def route_nets(self,keepout,pins):
 
-        unchecked_pins = set(self.pins)
+        self.prepare_routing(keepout,pins)
+        unchecked_pins = set(pins)
         pending_pins = set()
-
-        while unchecked_pins:
-            
-            starting_pin,starting_lenght = -1,len(self.matrix)*len(self.matrix[0])
-            for pn in unchecked_pins:
-                mp = self.compute_center(pn)
-                rez = self.generate_elastic_path(pn,*mp)
-                if len(rez) < starting_lenght: starting_pin,starting_lenght = pn,len(rez) 
-
-            starting_positions = [[int(i*len(self.matrix)/5),int(j*len(self.matrix[0])/5)] for i,j in product([1,2,3,4],[1,2,3,4])]
-            unchecked_pins.remove(starting_pin)
-            pending_pins.add(starting_pin)
-        
-            mp = self.compute_center(starting_pin)
-            rez = self.generate_elastic_path(starting_pin,*mp)
-            pending_pins.update(self.check_neighbroing_pins(rez,unchecked_pins))
-            unchecked_pins.difference_update(pending_pins)
-
-            while(True):
-                rez = set()
-                for pin in pending_pins: rez.update(self.check_neighbroing_pins(self.pins[pin],unchecked_pins))
-                if not rez: break
-                pending_pins.update(rez)
+        unrouted = set()
+
+        while unchecked_pins and not self.budget.exhausted():
+
+            with self.stats.phase("cluster_growth"):
+                starting_pin,starting_lenght = -1,len(self.matrix)*len(self.matrix[0])
+                for pn in unchecked_pins:
+                    mp = self.compute_center(pn)
+                    rez = self.route(keepout,pn,mp)
+                    if rez is not None and len(rez) < starting_lenght: starting_pin,starting_lenght = pn,len(rez)
+                if starting_pin == -1: break
+
+                starting_positions = [[int(i*len(self.matrix)/5),int(j*len(self.matrix[0])/5)] for i,j in product([1,2,3,4],[1,2,3,4])]
+                unchecked_pins.remove(starting_pin)
+                pending_pins.add(starting_pin)
+                self.proximity.claim(pending_pins)
+
+                mp = self.compute_center(starting_pin)
+                rez = self.route(keepout,starting_pin,mp)
+                pending_pins.update(self.check_neighbroing_pins(rez,unchecked_pins))
                 unchecked_pins.difference_update(pending_pins)
-            
-            self.fields_backup = copy.deepcopy(self.fields)
-            for perm in itertools.permutations(pending_pins):
-                for sp in starting_positions:
-                    deadlock = False
-                    all_routs = set()
-
-                    self.fields = copy.deepcopy(self.fields_backup)
-                    sol_matrix = copy.deepcopy(self.matrix)
-                    new_path = self.generate_elastic_path(perm[0],*sp)
-                    all_routs.update(new_path)
-
-                    for poz in new_path:
-                        sol_matrix[poz[0]][poz[1]] = perm[0]
-                    
-                    for pin in pending_pins:
-                        for pin_poz in self.pins[pin]:
-                            self.fields[tuple(pin_poz)] = self.generate_one_vector_field(pin_poz,copy.deepcopy(sol_matrix))
-
-                    for el in perm[1:]: 
-                        rez = self.generate_elastic_path(el,*self.compute_center(el))
-                        if rez == -1: deadlock = True; break
-                        all_routs.update(rez)
-
-                        for poz in rez:
-                            sol_matrix[poz[0]][poz[1]] = el
-
-                        for pin in pending_pins:
-                            for pin_poz in self.pins[pin]:
-                                self.fields[tuple(pin_poz)] = self.generate_one_vector_field(pin_poz,copy.deepcopy(sol_matrix))
-
-                    if not deadlock and not self.check_neighbroing_pins(all_routs,unchecked_pins):
-                        self.matrix = sol_matrix
-                        pending_pins = set()
-                        break
-                
-                if not pending_pins:
-                    for pin in unchecked_pins:
-                        for pin_poz in self.pins[pin]:
-                            self.fields[tuple(pin_poz)] = self.generate_one_vector_field(pin_poz,copy.deepcopy(self.matrix))
-                    break
-
-        self.drawing_func(matrix = self.trim_matrix(self.matrix))
+                self.proximity.claim(pending_pins)
+
+                while(True):
+                    rez = set()
+                    for pin in pending_pins: rez.update(self.check_neighbroing_pins(self.pins.flat(pin),unchecked_pins))
+                    if not rez: break
+                    pending_pins.update(rez)
+                    unchecked_pins.difference_update(pending_pins)
+                    self.proximity.claim(pending_pins)
+
+            with self.stats.phase("search"):
+                found = self.search(keepout,starting_positions,pending_pins,unchecked_pins)
+            if found:
+                keepout.journal.clear()
+                self.repair_vector_fields(keepout,np.unique(np.concatenate(found[1])),unchecked_pins)
+            else: unrouted |= pending_pins
+            self.budget.finish(pending_pins,bool(found))
+            pending_pins = set()
+
+        return unrouted | unchecked_pins
+
+    def search(self,keepout,starting_positions,pending_pins,unchecked_pins):
+        engine = OrderingSearch(self,keepout,pending_pins,unchecked_pins,self.beam_width)
+        roots = engine.roots(starting_positions)
+
+        if self.workers > 1:
+            routes = parallel_search(self,roots,pending_pins,unchecked_pins,self.workers)
+            return routes and (routes,[keepout.write(path,pin_nr) for pin_nr,path in routes])
+
+        for pin,sp in roots:
+            if self.budget.exhausted(): return None
+            found = engine.run_root(pin,sp)
+            if found: return found
+
+    def net_field(self,pin_nr):
+        fields = [self.fields[tuple(pin_poz)] for pin_poz in self.pins[pin_nr]]
+        net = self.net_fields.get(pin_nr)
+        if net is None or net.key != tuple(field.key for field in fields):
+            net = self.net_fields[pin_nr] = NetField(fields)
+        return net
 
     def generate_elastic_path(self,pin_nr,i,j):
+        with self.stats.phase("elastic_path"):
+            return self.elastic_path(pin_nr,i,j)
+
+    def elastic_path(self,pin_nr,i,j):
 
-        paths = set()
-        
-        start = [i,j]
-        while not isinstance(self.fields[tuple(self.pins[pin_nr][0])][start[0]][start[1]],list) :
-            if self.fields[tuple(self.pins[pin_nr][0])][start[0]][start[1]] == 0: return -1
-            start[0] -= 1
-            start[1] -= 1
-
-        prev_poz = []
-        corectare = True
-        while corectare:
-
-            corectare = False
-            dir_set = set()
-            for pin_poz in self.pins[pin_nr]:
-                if isinstance(self.fields[tuple(pin_poz)][start[0]][start[1]],list):
-                    dir_set.add(tuple(self.fields[tuple(pin_poz)][start[0]][start[1]]))
-            
-            dir_set = list(dir_set)
-            
-            rez_vec = [sum(x[0] for x in dir_set),sum(x[1] for x in dir_set)]
-            if rez_vec != [0,0]:
-                nxt = [x+y for x,y in zip(start,rez_vec)]
-                if nxt == prev_poz: break
-                prev_poz = start
-                if isinstance(self.fields[tuple(self.pins[pin_nr][0])][nxt[0]][nxt[1]],list):
-                    corectare = True
-                    start = nxt
-
-        paths.add(tuple(start))
-
-        for pin_poz in self.pins[pin_nr]:
-            pp = self.fields[tuple(pin_poz)]
-            nxt = start
-            while pp[nxt[0]][nxt[1]] != "F":
-                if pp[nxt[0]][nxt[1]] == 0: return -1
-                nxt = [x+y for x,y in zip(nxt,pp[nxt[0]][nxt[1]])]
-                paths.add(tuple(nxt))
-
-        sol_matrix = copy.deepcopy(self.matrix)
-        for node in paths: sol_matrix[node[0]][node[1]] = pin_nr
-        
-        return paths
+        net = self.net_field(pin_nr)
+        lead = net.codes[0]
+        height,width = self.matrix.shape
+
+        first = i*width+j
+        while not is_step(lead[i*width+j]):
+            if lead[i*width+j] == UNREACHED: return None
+            i,j = (i-1) % height,(j-1) % width
+            if i*width+j == first: return None
+
+        start = i*width+j
+        visited = {start}
+        while net.resultant[start]:
+            nxt = start + net.resultant[start]
+            if nxt in visited or not is_step(lead[nxt]): break
+            start = nxt
+            visited.add(start)
+
+        return net.trace(start)
+
+    def find_violations(self,incremental = False):
+        if self.validator.radius != self.clearance: self.validator = Validator(self.clearance)
+        with self.stats.phase("validation"):
+            if incremental: return self.validator.update(Solver.trim_matrix(self.matrix))
+            return self.validator.validate(Solver.trim_matrix(self.matrix))
 
     def validate_solution(self):
-        
-        bad_nodes = set()
-        
-        for i,row in enumerate(self.matrix):
-            for j,el in enumerate(row):
-                if isinstance(el, int) and el > 0:
-                    for ir,jr in product([-1, 0, 1],[-1, 0, 1]):
-                        if self.matrix[i+ir][j+jr] not in (0,"B",el):
-                            bad_nodes.add((i,j))
-
-        for node in bad_nodes:
-            self.drawing_func("E",node[0],node[1])
-    
+
+        violations = self.find_violations()
+        for i,j in sorted({violation.cell for violation in violations}):
+            self.drawing_func("E",i+1,j+1)
+
+        return violations
@@ -0,0 +1,145 @@
+import json
+import time
+import numpy as np
+from my_board import CELL_DTYPE, EMPTY, BORDER, ZPIN, PinIndex
+from my_search import Budget
+from my_solver import Solver
+from my_validation import Violation
+
+SPARSE_SUFFIX = ".nets"
+
+def as_cells(cells):
+    return np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+
+class SparseBoard:
+
+    def __init__(self, shape, nets = None, zpins = ()):
+        self.shape = tuple(int(size) for size in shape)
+        self.nets = {int(net): as_cells(cells) for net, cells in (nets or {}).items()}
+        self.zpins = as_cells(zpins)
+        self.routes = {}
+
+    @classmethod
+    def from_dense(cls, mat):
+        pins = PinIndex(mat)
+        return cls(mat.shape, {pin: pins[pin] for pin in pins}, np.argwhere(mat == ZPIN))
+
+    @classmethod
+    def read(cls, path):
+        with open(path) as file: data = json.load(file)
+        board = cls(data["shape"], data["nets"], data.get("zpins", ()))
+        board.routes = {int(net): as_cells(cells) for net, cells in data.get("routes", {}).items()}
+        return board
+
+    def write(self, path):
+        data = {"shape": list(self.shape),
+                "nets": {str(net): cells.tolist() for net, cells in sorted(self.nets.items())},
+                "zpins": self.zpins.tolist()}
+        if self.routes: data["routes"] = {str(net): cells.tolist() for net, cells in sorted(self.routes.items())}
+        with open(path, "w") as file: json.dump(data, file)
+
+    def cells(self, net):
+        return self.routes.get(net, self.nets[net])
+
+    def bbox(self, net):
+        cells = self.nets[net]
+        return int(cells[:, 0].min()), int(cells[:, 0].max()) + 1, int(cells[:, 1].min()), int(cells[:, 1].max()) + 1
+
+    def windows(self, margin, clearance):
+        groups = [({net}, self.pad(self.bbox(net), margin)) for net in sorted(self.nets)]
+        merged = True
+        while merged:
+            merged, pending, groups = False, groups, []
+            for nets, box in pending:
+                for other in groups:
+                    if self.overlap(self.pad(box, clearance), self.pad(other[1], clearance)):
+                        other[0].update(nets)
+                        other[1][:] = min(box[0], other[1][0]), max(box[1], other[1][1]), min(box[2], other[1][2]), max(box[3], other[1][3])
+                        merged = True
+                        break
+                else: groups.append((nets, list(box)))
+        return [(nets, tuple(box)) for nets, box in groups]
+
+    def pad(self, box, margin):
+        top, bottom, left, right = box
+        return [max(top - margin, 0), min(bottom + margin, self.shape[0]), max(left - margin, 0), min(right + margin, self.shape[1])]
+
+    @staticmethod
+    def overlap(a, b):
+        return a[0] < b[1] and b[0] < a[1] and a[2] < b[3] and b[2] < a[3]
+
+    def materialize(self, top, bottom, left, right, nets = None):
+        mat = np.full((bottom - top, right - left), EMPTY, dtype=CELL_DTYPE)
+        for cells, val in [(self.zpins, ZPIN)] + [(self.cells(net), net) for net in (self.nets if nets is None else nets)]:
+            inside = (cells[:, 0] >= top) & (cells[:, 0] < bottom) & (cells[:, 1] >= left) & (cells[:, 1] < right)
+            mat[cells[inside, 0] - top, cells[inside, 1] - left] = val
+        return mat
+
+    def to_dense(self):
+        return self.materialize(0, self.shape[0], 0, self.shape[1])
+
+    def violations(self, radius = 1):
+        occupied = [(self.zpins, np.full(len(self.zpins), ZPIN))] + [(self.cells(net), np.full(len(self.cells(net)), net)) for net in sorted(self.nets)]
+        cells = np.concatenate([cells for cells, _ in occupied])
+        values = np.concatenate([values for _, values in occupied])
+        keys = cells[:, 0]*self.shape[1] + cells[:, 1]
+        order = np.argsort(keys, kind="stable")
+        keys, cells, values = keys[order], cells[order], values[order]
+
+        found = set()
+        wired = values > 0
+        for di in range(-radius, radius + 1):
+            for dj in range(-radius, radius + 1):
+                if di == dj == 0: continue
+                rows, cols = cells[wired, 0] + di, cells[wired, 1] + dj
+                inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+                at = np.minimum(np.searchsorted(keys, rows*self.shape[1] + cols), keys.size - 1)
+                other = values[at]
+                bad = inside & (keys[at] == rows*self.shape[1] + cols) & (other != values[wired])
+                found.update(zip(cells[wired][bad, 0].tolist(), cells[wired][bad, 1].tolist(), values[wired][bad].tolist(), other[bad].tolist()))
+
+        return [Violation((i, j), (net, other), "clearance" if other > 0 else "obstacle") for i, j, net, other in sorted(found)]
+
+def solve_window(board, nets, box, clearance = 1, router = None, budget = None, strategy = "search", stats = None):
+    top, bottom, left, right = board.pad(box, clearance)
+    window = board.materialize(top, bottom, left, right, nets)
+    window = np.pad(window, [(clearance*(top == 0), clearance*(bottom == board.shape[0])),
+                             (clearance*(left == 0), clearance*(right == board.shape[1]))], constant_values=BORDER)
+    top, left = top - clearance*(top == 0), left - clearance*(left == 0)
+
+    ring = np.ones(window.shape, dtype=bool)
+    ring[clearance:-clearance, clearance:-clearance] = False
+    window[ring & (window == EMPTY)] = BORDER
+
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+    solver.matrix, solver.clearance = window, clearance
+    if stats is not None: solver.instrument(stats.enabled)
+    solver.get_pins()
+
+    budget = budget or Budget()
+    time_limit = None if budget.deadline is None else max(budget.deadline - time.monotonic(), 0)
+    max_candidates = None if budget.max_candidates is None else budget.max_candidates - budget.candidates
+    unrouted = solver.solve(router, time_limit, max_candidates, strategy=strategy)
+    budget.candidates += solver.budget.candidates
+    if stats is not None: stats.merge(solver.stats)
+
+    for net in set(nets) - set(unrouted):
+        board.routes[net] = np.argwhere(solver.matrix == net) + (top, left)
+    return set(unrouted)
+
+def solve_sparse(board, router = None, time_limit = None, strategy = "search", margin = 8, clearance = 1, max_candidates = None, stats = None):
+    board.routes = {}
+    budget = Budget(time_limit, max_candidates)
+    if stats is not None: stats.reset()
+
+    unrouted = set()
+    for nets, box in board.windows(margin, clearance):
+        if budget.exhausted(): unrouted |= nets
+        else: unrouted |= solve_window(board, nets, box, clearance, router, budget, strategy, stats)
+
+    unrouted = sorted(unrouted)
+    if stats is not None:
+        name = "MazeRouter" if strategy == "negotiate" else type(router).__name__ if router else "ElasticRouter"
+        stats.emit(nets=len(board.nets), unrouted=unrouted, strategy=strategy, router=name)
+    return unrouted
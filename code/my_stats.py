@@ -0,0 +1,58 @@
+from collections import Counter, defaultdict
+import json
+import time
+
+PHASES = ("get_pins", "fields", "cluster_growth", "search", "elastic_path", "validation")
+
+class _Timer:
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.times[self.name] += time.perf_counter() - self.start
+        self.stats.calls[self.name] += 1
+
+class _Idle:
+
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+_IDLE = _Idle()
+
+class Stats:
+
+    def __init__(self, enabled = False, sink = None):
+        self.enabled = enabled
+        self.sink = sink
+        self.reset()
+
+    def reset(self):
+        self.times = defaultdict(float)
+        self.calls = Counter()
+        self.counts = Counter()
+
+    def phase(self, name):
+        return _Timer(self, name) if self.enabled else _IDLE
+
+    def merge(self, other):
+        for name, seconds in other.times.items(): self.times[name] += seconds
+        self.calls.update(other.calls)
+        self.counts.update(other.counts)
+
+    def count(self, name, amount = 1):
+        if self.enabled: self.counts[name] += amount
+
+    def report(self):
+        return {"times": {name: round(self.times[name], 6) for name in PHASES if name in self.times},
+                "calls": {name: self.calls[name] for name in PHASES if name in self.calls},
+                "counts": dict(sorted(self.counts.items()))}
+
+    def emit(self, **fields):
+        if not (self.enabled and self.sink): return
+        self.sink.write(json.dumps({**fields, **self.report()}) + "\n")
+        self.sink.flush()
@@ -0,0 +1,51 @@
+from collections import namedtuple
+from itertools import product
+import numpy as np
+from my_board import EMPTY, BORDER
+
+Violation = namedtuple("Violation", "cell nets rule")
+
+def check_cells(mat, rows, cols, radius = 1):
+    height, width = mat.shape
+    own = mat[rows, cols]
+
+    found = set()
+    for di, dj in product(range(-radius, radius + 1), repeat=2):
+        if di == dj == 0: continue
+        near_rows, near_cols = rows + di, cols + dj
+        inside = (near_rows >= 0) & (near_rows < height) & (near_cols >= 0) & (near_cols < width)
+        other = np.where(inside, mat[near_rows.clip(0, height - 1), near_cols.clip(0, width - 1)], BORDER)
+        bad = (other != EMPTY) & (other != BORDER) & (other != own)
+        found.update(zip(rows[bad].tolist(), cols[bad].tolist(), own[bad].tolist(), other[bad].tolist()))
+
+    return [Violation((i, j), (net, other), "clearance" if other > 0 else "obstacle") for i, j, net, other in sorted(found)]
+
+class Validator:
+
+    def __init__(self, radius = 1):
+        self.radius = radius
+        self.violations = None
+        self.changed = set()
+
+    def validate(self, mat):
+        self.changed = set()
+        self.violations = check_cells(mat, *np.nonzero(mat > 0), self.radius)
+        return self.violations
+
+    def invalidate(self): self.violations = None
+    def touch(self, cell): self.changed.add(tuple(cell))
+
+    def update(self, mat):
+        if self.violations is None: return self.validate(mat)
+        if not self.changed: return self.violations
+
+        steps = range(-self.radius, self.radius + 1)
+        recheck = {(i + di, j + dj) for i, j in self.changed for di, dj in product(steps, steps)
+                   if 0 <= i + di < mat.shape[0] and 0 <= j + dj < mat.shape[1]}
+        rows, cols = np.array(sorted(recheck)).T
+        wired = mat[rows, cols] > 0
+
+        kept = [violation for violation in self.violations if violation.cell not in recheck]
+        self.violations = sorted(kept + check_cells(mat, rows[wired], cols[wired], self.radius))
+        self.changed = set()
+        return self.violations
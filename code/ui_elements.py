@@ -228,7 +228,7 @@ class NewBoardDialog(wx.Dialog):
         txt.SetFont(self.font)
         normal_hbox.Add(txt)
 
-        self.squarespnr = wx.SpinCtrl(pnl, initial = 10, min = 5, max = 50 , size = (50,30), style = wx.NO_BORDER)
+        self.squarespnr = wx.SpinCtrl(pnl, initial = 10, min = 5, max = 200 , size = (50,30), style = wx.NO_BORDER)
         self.squarespnr.SetBackgroundColour((50,50,50))
         self.squarespnr.SetForegroundColour(wx.WHITE)
         self.squarespnr.SetFont(self.font)
@@ -252,7 +252,7 @@ class NewBoardDialog(wx.Dialog):
         txt.SetFont(self.font)
         width_box.Add(txt)
 
-        self.widthspnr = wx.SpinCtrl(pnl, initial = 10, min = 5, max = 50 , size = (50,30), style = wx.NO_BORDER)
+        self.widthspnr = wx.SpinCtrl(pnl, initial = 10, min = 5, max = 200 , size = (50,30), style = wx.NO_BORDER)
         self.widthspnr.SetBackgroundColour((50,50,50))
         self.widthspnr.SetForegroundColour(wx.WHITE)
         self.widthspnr.SetFont(self.font)
@@ -267,7 +267,7 @@ class NewBoardDialog(wx.Dialog):
         txt.SetFont(self.font)
         height_box.Add(txt)
 
-        self.heightspnr = wx.SpinCtrl(pnl, initial = 10, min = 5, max = 50 , size = (50,30), style = wx.NO_BORDER)
+        self.heightspnr = wx.SpinCtrl(pnl, initial = 10, min = 5, max = 200 , size = (50,30), style = wx.NO_BORDER)
         self.heightspnr.SetBackgroundColour((50,50,50))
         self.heightspnr.SetForegroundColour(wx.WHITE)
         self.heightspnr.SetFont(self.font)
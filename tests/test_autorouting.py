@@ -0,0 +1,20 @@
+import os
+import shutil
+from autorouting import main
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+def test_solve_rejects_boards_with_the_same_name(tmp_path):
+    for folder in ("a", "b"):
+        os.makedirs(tmp_path/folder)
+        shutil.copy(os.path.join(DATA, "Simple.csv"), tmp_path/folder)
+    out = tmp_path/"results"
+    assert main(["solve", str(tmp_path/"*"/"Simple.csv"), "--out", str(out), "--jobs", "1"]) == 2
+    assert not out.exists()
+
+def test_negotiate_rejects_other_routers(tmp_path):
+    out = tmp_path/"results"
+    board = os.path.join(DATA, "Simple.csv")
+    assert main(["solve", board, "--router", "coarse", "--strategy", "negotiate", "--out", str(out), "--jobs", "1"]) == 2
+    assert not out.exists()
+    assert main(["solve", board, "--strategy", "negotiate", "--out", str(out), "--jobs", "1"]) == 0
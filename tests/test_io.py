@@ -0,0 +1,11 @@
+import numpy as np
+from my_board import CELL_DTYPE, ZPIN
+from my_io import read_binary, read_board, write_binary, write_board
+
+def test_board_round_trips_at_the_cell_limits(tmp_path):
+    top = np.iinfo(CELL_DTYPE).max
+    mat = np.array([[top, ZPIN, 0], [1, top, ZPIN]], dtype=CELL_DTYPE)
+    write_board(tmp_path/"board.csv", mat)
+    assert np.array_equal(read_board(tmp_path/"board.csv"), mat)
+    write_binary(tmp_path/"board.arb", mat)
+    assert np.array_equal(read_binary(tmp_path/"board.arb"), mat)
@@ -0,0 +1,29 @@
+import os
+import numpy as np
+import pytest
+from my_board import DIRECTIONS
+from my_generator import generate_board
+from my_routers import CoarseRouter, MazeRouter
+from my_solver import Solver
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+def dangling(mat, pins):
+    found = []
+    for pin, terminals in pins.items():
+        terminals = {tuple(cell) for cell in terminals}
+        for i, j in zip(*np.nonzero(mat == pin)):
+            if (i, j) in terminals: continue
+            if sum(mat[i + di, j + dj] == pin for di, dj in DIRECTIONS) <= 1: found.append((int(i), int(j)))
+    return found
+
+@pytest.mark.parametrize("router", [MazeRouter, CoarseRouter])
+@pytest.mark.parametrize("board", ["StepTwo", 3, 4])
+def test_routes_have_no_dangling_spurs(router, board):
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+    if isinstance(board, str): solver.read_from_csv(os.path.join(DATA, board + ".csv"))
+    else: solver.set_matrix(generate_board(40, nets=8, seed=board))
+    pins = {pin: list(cells) for pin, cells in solver.pins.items()}
+    solver.solve(router(), time_limit=10)
+    assert dangling(solver.matrix, pins) == []
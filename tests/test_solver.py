@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import threading
+import numpy as np
+import pytest
+from my_board import CELL_DTYPE, ZPIN, PinIndex
+from my_generator import generate_board
+from my_io import read_board
+from my_routers import CoarseRouter, ElasticRouter
+from my_solver import Solver
+from my_sparse import SparseBoard
+from my_validation import Validator
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+def make_solver(mat):
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+    solver.set_matrix(mat)
+    return solver
+
+def test_cycling_elastic_walk_respects_time_limit():
+    solver = make_solver(generate_board(30, nets=8, terminals=3, zpins=0.02, clustering=0.3, seed=1))
+    worker = threading.Thread(target=solver.solve, kwargs={"time_limit": 1.0}, daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive()
+
+@pytest.mark.parametrize("mat", [
+    np.array([[1 if (i, j) in ((0, 4), (4, 0)) else ZPIN if i == j else 0 for j in range(10)] for i in range(10)]),
+    np.array([[0, 0, 0], [1, ZPIN, 1], [0, 0, 0]]),
+    np.array([[1, ZPIN, 1]]),
+])
+def test_blocked_start_diagonal_respects_time_limit(mat):
+    solver = make_solver(mat)
+    worker = threading.Thread(target=solver.solve, kwargs={"time_limit": 2.0}, daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive()
+
+def test_violations_use_board_coordinates():
+    mat = np.zeros((6, 6), dtype=CELL_DTYPE)
+    mat[1, 1], mat[2, 2], mat[0, 5], mat[1, 4] = 1, 2, ZPIN, 1
+    solver = make_solver(mat)
+    assert [violation.cell for violation in solver.find_violations()] == [(1, 1), (1, 4), (2, 2)]
+    assert solver.find_violations() == SparseBoard.from_dense(mat).violations()
+
+def test_edit_routed_cell_after_solve():
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+    solver.read_from_csv(os.path.join(DATA, "StepOne.csv"))
+    solver.solve()
+    routed = int(solver.matrix[6, 3])
+    assert routed > 0
+
+    solver.set_cell(6, 3, 0)
+    solver.set_cell(6, 3, routed)
+    rebuilt = PinIndex(solver.matrix)
+    assert {pin: sorted(cells) for pin, cells in solver.pins.items()} == {pin: sorted(cells) for pin, cells in rebuilt.items()}
+    assert solver.pins.bounds == rebuilt.bounds
+
+def test_stats_cover_a_single_solve():
+    lines = io.StringIO()
+    solver = Solver()
+    solver.set_hook(lambda *args, **kwargs: None)
+    solver.instrument(True, lines)
+    reports = []
+    for _ in range(2):
+        solver.set_matrix(read_board(os.path.join(DATA, "StepTwo.csv")))
+        solver.solve()
+        reports.append(json.loads(lines.getvalue().splitlines()[-1]))
+    assert reports[0]["counts"]["candidates"] == reports[1]["counts"]["candidates"]
+    assert reports[0]["calls"] == reports[1]["calls"]
+
+def test_parallel_search_matches_serial():
+    boards = [read_board(os.path.join(DATA, "StepOne.csv")), generate_board(30, nets=6, seed=3)]
+    for mat in boards:
+        results = []
+        for workers in (1, 3):
+            solver = make_solver(mat)
+            solver.workers = workers
+            solver.solve()
+            results.append(solver.matrix)
+        assert np.array_equal(*results)
+
+def test_incremental_validation_matches_full_check():
+    solver = make_solver(generate_board(60, nets=12, seed=2))
+    solver.find_violations(incremental=True)
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        i, j = rng.integers(1, 61, 2)
+        solver.set_cell(int(i), int(j), int(rng.integers(0, 13)))
+        assert solver.find_violations(incremental=True) == Validator().validate(Solver.trim_matrix(solver.matrix))
+
+def test_validation_uses_solver_clearance():
+    mat = np.zeros((5, 5), dtype=CELL_DTYPE)
+    mat[0, 0], mat[2, 2] = 1, 2
+    solver = make_solver(mat)
+    assert solver.find_violations() == []
+    solver.clearance = 2
+    assert [violation.cell for violation in solver.find_violations()] == [(0, 0), (2, 2)]
+
+@pytest.mark.parametrize("router", [ElasticRouter, CoarseRouter])
+def test_negotiate_rejects_other_routers(router):
+    solver = make_solver(read_board(os.path.join(DATA, "Simple.csv")))
+    with pytest.raises(ValueError):
+        solver.solve(router(), strategy="negotiate")
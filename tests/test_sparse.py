@@ -0,0 +1,24 @@
+import time
+from my_generator import generate_board
+from my_sparse import SparseBoard, solve_sparse
+from my_stats import Stats
+
+def stacked_board(count):
+    nets, zpins = {}, []
+    for k in range(count):
+        part = SparseBoard.from_dense(generate_board(30, nets=8, terminals=3, zpins=0.02, clustering=0.3, seed=k))
+        for cells in part.nets.values(): nets[len(nets) + 1] = cells + (100*k, 0)
+        zpins += (part.zpins + (100*k, 0)).tolist()
+    return SparseBoard((100*count, 30), nets, zpins)
+
+def test_windows_share_one_time_limit():
+    board = stacked_board(12)
+    assert len(board.windows(8, 1)) == 12
+    start = time.monotonic()
+    solve_sparse(board, time_limit=1.0)
+    assert time.monotonic() - start < 3.0
+
+def test_windows_share_one_candidate_budget():
+    stats = Stats(True)
+    solve_sparse(stacked_board(4), max_candidates=10, stats=stats)
+    assert stats.counts["candidates"] <= 10